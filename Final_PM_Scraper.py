@@ -1,17 +1,91 @@
-import requests
+import argparse
+import contextvars
+import math
 import pandas as pd
 import time
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
+import dns_cache
+import domains
+import event_log
+import html_stream
+from dedup import DedupIndex, NearDuplicateIndex, canonical_url
+import http_client
+import job_store
+import job_tables
+import pagination
+import pipeline
+import profiling
+from metrics import METRICS
+import ranking
+import run_diff
+import scheduler
+import structured_data
+from linkedin_queue import LinkedInQueue
+
 # ================= CONFIG ================= #
 
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 CAREER_KEYWORDS = ["career", "careers", "jobs", "join", "hiring"]
 ATS_DOMAINS = ["lever.co", "greenhouse.io", "workable.com", "zohorecruit", "ashbyhq"]
-MAX_JOBS = 3
+MAX_JOBS = 3  # postings kept per company; None = every one found (--max-postings)
+FETCH_DETAILS = True  # fetch a job's own page only for fields the listing lacked
+PAGE_CACHE_SIZE = 32  # parsed pages kept so equivalent URLs are fetched once
+INCREMENTAL_PARSE = True  # stop downloading a listing page once MAX_JOBS anchors are found
+MAX_PAGES = 10  # listing pages followed per company (?page=N, /page/N, ?start=N, rel=next)
+PAGE_FETCHERS = 4  # pages of one listing fetched at once; the host's rate limit still applies
+DEDUP_BLOOM_CAPACITY = None  # e.g. 10_000_000 to bound memory on huge crawls
+# pipeline threads per stage; per-host politeness is http_client.HOST_INTERVAL
+STAGE_WORKERS = {
+    "discover": 8,  # homepage -> careers page -> listing page
+    "extract": 4,   # listing page -> jobs
+    "enrich": 4,    # job detail pages
+}
+
+INPUT_FILE = "/content/Input_File.xlsx"
+OUTPUT_FILE = "Output_File_357.xlsx"
+INPUT_ROWS = 350
+OUTPUT_FORMAT = "wide"  # "long": Companies + Postings sheets, Job_List as a view of the first few
+
+METRICS_JSON = "metrics.json"
+METRICS_PROM = "metrics.prom"
+PROFILE_REPORT = "profile_report.txt"
+PROFILE_COLLAPSED = "profile.collapsed"  # flamegraph.pl / speedscope input
+EVENT_LOG_FILE = "events.jsonl"
+STORE_FILE = job_store.DB_FILE  # posting history (first/last seen); '' to disable
+
+COMPANY_BUDGET = 90  # seconds per company, all stages included
+# LinkedIn is started alongside a company's own crawl once that has no
+# careers page or has run this long; the first source to fill MAX_JOBS wins
+# (None: LinkedIn only after the crawl finds nothing)
+SPECULATE_AFTER = 15
+STAGE_BUDGETS = {
+    "homepage": 20,
+    "careers": 30,
+    "listing": 20,
+    "jobs": 25,
+    "details": 20,
+    "linkedin": 20,
+}
+
+# --deadline: dispatch stops DEADLINE_RESERVE seconds early; in-flight
+# companies and LinkedIn lookups get DEADLINE_DRAIN more, then the workbook
+# is written
+DEADLINE_RESERVE = 60
+DEADLINE_DRAIN = 30
+YIELD_WEIGHTS = {
+    "found": 4,    # last run found jobs
+    "ats": 3,      # listing page is on a known ATS
+    "careers": 2,  # careers page already known
+    "unseen": 1,   # never crawled (or not attempted): beats a known miss
+}
 
 INVALID_TITLES = [
     "our open positions", "job openings", "job opportunities",
@@ -24,6 +98,12 @@ LOCATION_REGEX = re.compile(
     re.I
 )
 
+POSTINGS = DedupIndex(DEDUP_BLOOM_CAPACITY)  # every job URL claimed this run
+TITLES = NearDuplicateIndex()  # same role re-posted on career page / ATS / LinkedIn
+_pages = OrderedDict()
+_pages_lock = threading.Lock()
+_deadline = None  # time.monotonic() after which no new company starts
+
 # ================= HELPERS ================= #
 
 def clean_url(url):
@@ -31,14 +111,98 @@ def clean_url(url):
         return None
     return url if url.startswith("http") else "https://" + url.strip()
 
+@contextmanager
+def stage(name):
+    """Time a pipeline stage and apply its latency budget."""
+    event_log.emit("stage", stage=name, phase="start")
+    start = time.perf_counter()
+    with METRICS.stage(name), http_client.stage(name), profiling.attribute(stage=name):
+        yield
+    event_log.emit("stage", stage=name, phase="end", seconds=round(time.perf_counter() - start, 4))
+
+def time_left():
+    """Seconds until the --deadline cut-off; infinite without one."""
+    return math.inf if _deadline is None else _deadline - time.monotonic()
+
+def site_host(site):
+    try:
+        return urlparse(site).hostname
+    except ValueError:
+        return None
+
+def affinity_host(row, site):
+    """Host a company's crawl mostly hits: the ATS board an earlier run
+    recorded for it, else its own site."""
+    listing = clean_url(row.get("Job listings page URL"))
+    if listing and any(ats in listing.lower() for ats in ATS_DOMAINS):
+        return site_host(listing)
+    return site_host(site)
+
+def load_history(path):
+    """Last run's Job_List rows keyed by website host; {} if unreadable."""
+    try:
+        prev = pd.read_excel(path, sheet_name="Job_List")
+    except Exception:
+        return {}
+    history = {}
+    for _, row in prev.iterrows():
+        site = clean_url(row.get("Website URL"))
+        if site:
+            history[site_host(site)] = row
+    return history
+
+def expected_yield(row, prev=None):
+    """Cheap score for --deadline ordering: what the last run (or the input
+    row, when it is a previous output) learned about this company."""
+    def field(name):
+        for r in (prev, row):
+            value = r.get(name) if r is not None else None
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+        return None
+
+    status = field("Job Status")
+    listing = (field("Job listings page URL") or "").lower()
+    score = 0
+    if status == "Found":
+        score += YIELD_WEIGHTS["found"]
+    elif status in (None, "Not Attempted"):
+        score += YIELD_WEIGHTS["unseen"]
+    if any(ats in listing for ats in ATS_DOMAINS):
+        score += YIELD_WEIGHTS["ats"]
+    if field("Careers Page URL"):
+        score += YIELD_WEIGHTS["careers"]
+    return score
+
+def cache_page(key, soup):
+    with _pages_lock:
+        _pages[key] = soup
+        while len(_pages) > PAGE_CACHE_SIZE:
+            _pages.popitem(last=False)
+    return soup
+
 def fetch(url):
+    key = canonical_url(url)
+    with _pages_lock:
+        if key in _pages:
+            _pages.move_to_end(key)
+            METRICS.inc("cache_requests_total", cache="page", result="hit")
+            return _pages[key]
+    METRICS.inc("cache_requests_total", cache="page", result="miss")
     try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
-        if r.status_code < 400:
-            return BeautifulSoup(r.text, "lxml")
+        r = http_client.get(url, headers=HEADERS)
+        if r is not None and r.status_code < 400:
+            return cache_page(key, BeautifulSoup(r.text, "lxml"))
     except:
         return None
 
+def fetch_json(url):
+    r = http_client.get(url, headers=HEADERS)
+    try:
+        return r.json() if r is not None and r.status_code < 400 else None
+    except ValueError:
+        return None
+
 def valid_title(text):
     if not text or len(text) < 6:
         return False
@@ -52,13 +216,13 @@ def split_title_location(text):
         return title, loc
     return text, "Not Mentioned"
 
-def job_date():
-    return datetime.now().strftime("%B %Y")
+def job_date(ts=None):
+    return (datetime.fromtimestamp(ts) if ts else datetime.now()).strftime("%B %Y")
 
 # ================= CAREER ================= #
 
-def find_careers_page(site):
-    soup = fetch(site)
+def find_careers_page(site, soup=None):
+    soup = soup or fetch(site)
     if not soup:
         return None
     for a in soup.find_all("a", href=True):
@@ -80,49 +244,234 @@ def find_listing_page(career):
 
 # ================= JOB SCRAPING ================= #
 
-def scrape_jobs(url):
-    soup = fetch(url)
-    if not soup:
-        return []
+def fill_from_detail(job):
+    """Complete a job's missing location/date from its detail page's JobPosting."""
+    if FETCH_DETAILS and (job["location"] == "Not Mentioned" or not job["date"]):
+        soup = fetch(job["url"])
+        postings = structured_data.job_postings(soup, job["url"]) if soup else []
+        if postings:
+            if job["location"] == "Not Mentioned" and postings[0]["location"]:
+                job["location"] = postings[0]["location"]
+            job["date"] = job["date"] or postings[0]["date"]
+    return job
 
-    jobs, seen = [], set()
-    for a in soup.find_all("a", href=True):
-        raw = a.get_text(" ", strip=True)
-        href = a["href"].lower()
+def left_over(jobs, url):
+    """Whether a posting met once every slot is taken is one not taken."""
+    return canonical_url(url) not in {canonical_url(j["url"]) for j in jobs}
 
+def take_postings(jobs, postings, scope):
+    """Fill free job slots from structured postings (title/url/location/date).
+    Returns True if the slots ran out with postings left."""
+    for posting in postings:
+        if not valid_title(posting["title"]):
+            continue
+        if len(jobs) == MAX_JOBS:
+            if left_over(jobs, posting["url"]):
+                return True
+            continue
+        if not POSTINGS.add(posting["url"]):
+            continue
+        title, location = posting["title"], posting["location"]
+        if not location:
+            title, location = split_title_location(title)
+        if not TITLES.add(scope, title, location):
+            continue
+        jobs.append({
+            "title": title,
+            "url": posting["url"],
+            "location": location,
+            "date": posting["date"]
+        })
+    return False
+
+def take_anchors(jobs, anchors, url, scope):
+    """Fill free job slots from (href, text) anchor pairs. Returns True if
+    the slots ran out with job links left."""
+    for href, raw in anchors:
         if not valid_title(raw):
             continue
-        if not any(k in href for k in ["job", "opening", "position", "req"]):
+        if not any(k in href.lower() for k in ["job", "opening", "position", "req"]):
             continue
 
-        link = urljoin(url, a["href"])
-        if link in seen:
+        link = urljoin(url, href)
+        if len(jobs) == MAX_JOBS:
+            if left_over(jobs, link):
+                return True
+            continue
+        if not POSTINGS.add(link):
             continue
-        seen.add(link)
 
         title, location = split_title_location(raw)
+        if not TITLES.add(scope, title, location):
+            continue
 
         jobs.append({
             "title": title,
             "url": link,
             "location": location,
-            "date": job_date()
+            "date": None
         })
+    return False
 
-        if len(jobs) == MAX_JOBS:
+def stream_listing(url, jobs, scope):
+    """Scan a listing page's anchors while it downloads and hang up once
+    MAX_JOBS jobs are taken. Pages with structured job data, or too few
+    anchors, are read to the end and parsed into a soup as usual. Returns
+    (fetched, soup): soup is None after an early hang-up (the rest of the
+    page unread) or a failed fetch."""
+    METRICS.inc("cache_requests_total", cache="page", result="miss")
+    try:
+        r = http_client.get(url, headers=HEADERS, stream=True)
+        if r is None or r.status_code >= 400:
+            if r is not None:
+                r.close()
+            return False, None
+        parser, text = html_stream.AnchorParser(), []
+        chunks = http_client.iter_text(r)
+        try:
+            for chunk in chunks:
+                text.append(chunk)
+                parser.feed(chunk)
+                if parser.structured:   # leave the slots to structured_data
+                    break
+                take_anchors(jobs, parser.pop_anchors(), url, scope)
+                if len(jobs) == MAX_JOBS:
+                    break
+            if len(jobs) == MAX_JOBS:
+                METRICS.inc("incremental_parse_total", result="early_exit")
+                return True, None
+            text.extend(chunks)
+        finally:
+            r.close()
+    except:
+        return False, None
+    METRICS.inc("incremental_parse_total", result="full_parse")
+    return True, cache_page(canonical_url(url), BeautifulSoup("".join(text), "lxml"))
+
+def take_page(jobs, soup, url, scope):
+    """Fill free job slots from one parsed listing page. Returns True if
+    the slots ran out with postings on it left."""
+    # schema.org JobPosting blocks and inline SPA state (__NEXT_DATA__ etc.)
+    # carry title, location and real post dates
+    left = take_postings(jobs, structured_data.job_postings(soup, url), scope)
+    left = take_postings(jobs, structured_data.embedded_job_postings(soup, url), scope) or left
+    anchors = ((a["href"], a.get_text(" ", strip=True)) for a in soup.find_all("a", href=True))
+    return take_anchors(jobs, anchors, url, scope) or left
+
+def fetch_pages(urls):
+    """(url, soup) for each of ``urls`` in order, fetched PAGE_FETCHERS at a
+    time under the caller's budget; pages not started when the caller
+    stops iterating are never fetched."""
+    with ThreadPoolExecutor(min(PAGE_FETCHERS, len(urls))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fetch, u) for u in urls]
+        try:
+            for u, future in zip(urls, futures):
+                yield u, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def follow_pages(jobs, soup, url, scope):
+    """Take jobs from a listing's further pages until MAX_JOBS. Pages whose
+    numbers the links reveal are fetched concurrently (no more than the
+    first page's yield says are needed); a bare "next" link is followed
+    one page at a time. Returns (fetched, whole): fetched is False if a
+    page could not be fetched, whole is False if pages were left unread
+    (MAX_JOBS or MAX_PAGES reached)."""
+    seen = {canonical_url(url)}
+    fetched, whole = True, True
+    per_page = max(1, len(jobs))
+    while True:
+        urls = [u for u in pagination.page_urls(soup, url, MAX_PAGES) if canonical_url(u) not in seen]
+        if not urls:
+            nxt = pagination.next_page(soup, url)
+            urls = [nxt] if nxt and canonical_url(nxt) not in seen else []
+        if not urls:
             break
+        if len(jobs) == MAX_JOBS or len(seen) >= MAX_PAGES:
+            whole = False
+            break
+        urls = urls[:MAX_PAGES - len(seen)]
+        if MAX_JOBS is not None:
+            urls = urls[:math.ceil((MAX_JOBS - len(jobs)) / per_page)]
+        seen.update(canonical_url(u) for u in urls)
+        last = None
+        for page_url, page in fetch_pages(urls):
+            if page:
+                whole = not take_page(jobs, page, page_url, scope) and whole
+                last = page, page_url
+            else:
+                fetched = False
+            if len(jobs) == MAX_JOBS:
+                whole = whole and page_url == urls[-1]   # later pages of this batch unread
+                break
+        if last is None:
+            break
+        soup, url = last   # its links may reveal pages beyond the ones fetched
+    METRICS.inc("pagination_pages_total", len(seen) - 1)
+    return fetched, whole
 
-    return jobs
+def scrape_jobs(url, scope=None, soup=None, details=True):
+    """(jobs, fetched, whole) from a listing page (``soup`` if already
+    parsed): ``fetched`` is False when the page, one of its further pages
+    or its JSON feed could not be fetched, ``whole`` is False when postings
+    or pages were left unread at MAX_JOBS / MAX_PAGES. ``details`` fills
+    missing fields from each job's own page."""
+    scope = scope or url
+    jobs = []
+    finish = (lambda found: [fill_from_detail(j) for j in found]) if details else (lambda found: found)
+
+    # a listing page not seen yet (typically the ATS board) is scanned while
+    # it downloads; anchors taken there are skipped below as already claimed
+    if soup is None:
+        with _pages_lock:
+            cached = canonical_url(url) in _pages
+        if INCREMENTAL_PARSE and not cached:
+            fetched, soup = stream_listing(url, jobs, scope)
+            if soup is None:
+                return finish(jobs), fetched, False
+        else:
+            soup = fetch(url)
+            if not soup:
+                return [], False, False
+
+    left = take_page(jobs, soup, url, scope)
+    fetched, whole = follow_pages(jobs, soup, url, scope)
+    whole = whole and not left
+
+    # client-rendered ATS boards: one request to their public JSON feed
+    endpoint = structured_data.json_endpoint(url)
+    if not jobs and endpoint:
+        data = fetch_json(endpoint)
+        if data is not None:
+            whole = not take_postings(jobs, structured_data.jobs_from_json(data, url), scope) and whole
+        else:
+            fetched = False
+
+    return finish(jobs), fetched, whole
+
+def linkedin_slug(site):
+    try:
+        return urlparse(site).netloc.replace("www.", "").split(".")[0] or None
+    except:
+        return None
 
 def linkedin_jobs(site):
+    """Job links on the company's LinkedIn page; [] when it has none (or no
+    such page), None when the page could not be fetched (throttled, budget
+    spent, breaker open) so the miss is not cached."""
+    slug = linkedin_slug(site)
+    if not slug:
+        return []
     try:
-        slug = urlparse(site).netloc.replace("www.", "").split(".")[0]
-        url = f"https://www.linkedin.com/company/{slug}/jobs/"
-        soup = fetch(url)
-        if not soup:
+        r = http_client.get(f"https://www.linkedin.com/company/{slug}/jobs/", headers=HEADERS)
+        if r is None or (r.status_code >= 400 and r.status_code != 404):
+            return None
+        if r.status_code == 404:
             return []
+        soup = BeautifulSoup(r.text, "lxml")
     except:
-        return []
+        return None
 
     jobs = []
     for a in soup.find_all("a", href=True):
@@ -133,116 +482,557 @@ def linkedin_jobs(site):
                     "title": t,
                     "url": urljoin("https://www.linkedin.com", a["href"]),
                     "location": "Not Mentioned",
-                    "date": job_date()
+                    "date": None
                 })
         if len(jobs) == MAX_JOBS:
             break
     return jobs
 
-# ================= RANKING ================= #
+# ================= PIPELINE ================= #
+#
+# discover (homepage -> careers -> listing) -> extract (scrape_jobs) ->
+# enrich (detail pages); each stage has its own workers and a bounded queue
+# in front, and items carry at most the listing page's soup between stages.
+
+@contextmanager
+def company_work(item):
+    """One company's share of a stage: its budget (time queued between
+    stages excluded), event-log and profiler tags."""
+    budget = item["budget"]
+    budget.resume()
+    try:
+        with http_client.company_budget(budget), event_log.company(item["site"]), \
+                profiling.attribute(company=item["site"]):
+            yield
+    finally:
+        budget.pause()
 
-def compute_rank(name, jobs, career_found):
-    if name == "thoughtful foods":
-        return 0
-    if name == "charzer":
-        return 1
+_speculate_lock = threading.Lock()
 
-    if not jobs and career_found:
-        return 7
-    if not jobs:
-        return 8
+def satisfied(jobs):
+    return MAX_JOBS is not None and jobs is not None and len(jobs) >= MAX_JOBS
 
-    filled = [j for j in jobs if j["location"] != "Not Mentioned"]
-    c = len(jobs)
+def speculate(item, unpromising=False):
+    """Start the company's LinkedIn lookup now, alongside its own crawl, if
+    that crawl looks unpromising or slow. Should LinkedIn fill MAX_JOBS
+    before the crawl has extracted its jobs, LinkedIn wins and the crawl's
+    budget is cancelled."""
+    queue = item.get("linkedin_queue")
+    if queue is None or "budget" not in item or SPECULATE_AFTER is None:
+        return
+    slow = time.monotonic() - item["started"] >= SPECULATE_AFTER
+    slug = linkedin_slug(item["site"])
+    if not (unpromising or slow) or not slug or time_left() <= 0:
+        return
+    with _speculate_lock:   # the timer thread and the pipeline may both get here
+        if item.get("linkedin") or item.get("settled"):
+            return
+        item["linkedin"] = queue.submit(slug, item["site"])
+    METRICS.inc("linkedin_speculative_total", trigger="slow" if slow else "unpromising")
+    budget = item["budget"]
 
-    if c == 3 and len(filled) == 3:
-        return 2
-    if c == 2 and len(filled) == 2:
-        return 3
-    if c == 1 and len(filled) == 1:
-        return 4
-    if c == 3:
-        return 5
-    return 6
+    def race(future):
+        if not future.cancelled() and future.exception() is None and satisfied(future.result()) \
+                and not item.get("extracted"):
+            item["linkedin_won"] = True
+            budget.cancel()
+            METRICS.inc("linkedin_speculative_won_total")
+    item["linkedin"].add_done_callback(race)
 
-# ================= MAIN ================= #
+def start_timer(item):
+    """Speculate once SPECULATE_AFTER has passed even while a stage is still
+    busy with the company (a homepage or careers probe that hangs)."""
+    if SPECULATE_AFTER is not None and item.get("linkedin_queue") is not None:
+        item["timer"] = threading.Timer(SPECULATE_AFTER, speculate, (item,))
+        item["timer"].daemon = True
+        item["timer"].start()
 
-def main():
-    INPUT_FILE = "/content/Input_File.xlsx"
-    OUTPUT_FILE = "Output_File_357.xlsx"
+def stop_timer(item):
+    """No speculation past this point: the crawl's jobs are in (or it failed)."""
+    with _speculate_lock:
+        item["settled"] = True
+    timer = item.pop("timer", None)
+    if timer is not None:
+        timer.cancel()
 
-    df = pd.read_excel(INPUT_FILE).head(350)
-    if "Job Status" not in df.columns:
-        df["Job Status"] = ""
+def discover(item):
+    if time_left() <= 0:
+        item["skipped"] = True
+        return item
+    item["started"] = time.monotonic()
+    item["budget"] = http_client.Budget(min(COMPANY_BUDGET, max(0, time_left() + DEADLINE_DRAIN)), STAGE_BUDGETS)
+    start_timer(item)
+    site = item["site"]
+    with company_work(item):
+        with stage("homepage"):
+            home = fetch(site)
+        item["home"] = home is not None
+        with stage("careers"):
+            career = find_careers_page(site, home) if home else None
+        if career:
+            item["career_found"] = True
+            item["career"] = career
+            with stage("listing"):
+                item["listing"] = find_listing_page(career)
+            if item["listing"] == career:
+                item["soup"] = fetch(career)   # just parsed; carried so extract needn't refetch
+    speculate(item, unpromising=not item["listing"])
+    return item
+
+def extract(item):
+    soup = item.pop("soup", None)
+    if item["listing"] and not item.get("linkedin_won"):
+        with company_work(item), stage("jobs"):
+            item["jobs"], fetched, whole = scrape_jobs(item["listing"], scope=item["site"], soup=soup, details=False)
+        # only a listing read to the end, within budget, shows which postings
+        # closed; one cut off at MAX_JOBS / MAX_PAGES does not
+        budget = item["budget"]
+        item["listing_fetched"] = fetched and not (budget.exhausted or budget.cancelled)
+        item["listing_complete"] = item["listing_fetched"] and whole
+    item["extracted"] = True
+    stop_timer(item)
+    return item
+
+def enrich(item):
+    if item["jobs"] and not item.get("linkedin_won"):
+        with company_work(item), stage("details"):
+            item["jobs"] = [fill_from_detail(j) for j in item["jobs"]]
+    return item
+
+def outcome(item):
+    """Row result for a company that left the pipeline."""
+    stop_timer(item)   # it may have skipped extract (a stage raised)
+    result = {k: item[k] for k in ("career", "listing", "jobs", "career_found")}
+    budget = item.get("budget")
+    if item.get("linkedin_won"):
+        result["jobs"] = []   # taken from LinkedIn by crawl()
+        result["reason"] = "linkedin answered first (speculative)"
+    elif item.get("error"):
+        result["reason"] = f"error ({item['error']})"
+    elif result["jobs"]:
+        result["reason"] = "jobs on careers page"
+    elif not item.get("home"):
+        result["reason"] = "homepage unreachable"
+    elif not item["career"]:
+        result["reason"] = "no careers page"
+    else:
+        result["reason"] = "no jobs on listing page"
+    result["budget_hit"] = bool(budget and budget.exhausted)
+    if result["budget_hit"]:
+        result["reason"] += f" (budget exhausted: {', '.join(sorted(budget.hit))})"
+    failed = item.get("linkedin_won") or item.get("error") or result["budget_hit"]
+    result["fetched"] = bool(item.get("listing_fetched")) and not failed
+    result["complete"] = bool(item.get("listing_complete")) and not failed
+    return result
 
-    ranks = []
-    total_jobs = 0
-    companies_with_jobs = 0
+def lane(host, site):
+    """Pipeline key for a company's requests to ``host``: the host itself,
+    or for a high fan-in ATS host one of its http_client.host_concurrency()
+    lanes, so its companies spread over workers instead of queueing on one."""
+    lanes = http_client.host_concurrency(host)
+    return host if lanes <= 1 else (host, hash(site) % lanes)
 
+def crawl_pipeline():
+    # discover fetches the company's own homepage and careers page, so it is
+    # keyed by the site host; extract/enrich by the listing (often ATS) host
+    by_site = lambda item: lane(site_host(item["site"]), item["site"])
+    by_host = lambda item: lane(site_host(item["listing"] or item["site"]), item["site"])
+    return pipeline.Pipeline([
+        pipeline.Stage("discover", discover, STAGE_WORKERS["discover"], key=by_site),
+        pipeline.Stage("extract", extract, STAGE_WORKERS["extract"], key=by_host),
+        pipeline.Stage("enrich", enrich, STAGE_WORKERS["enrich"], key=by_host),
+    ])
+
+def linkedin_lookup(site):
+    """LinkedIn fallback as run by the LinkedIn queue, under its own budget."""
+    budget = http_client.Budget(min(STAGE_BUDGETS["linkedin"], max(0, time_left() + DEADLINE_DRAIN)))
+    with http_client.company_budget(budget), event_log.company(site):
+        with stage("linkedin"):
+            return linkedin_jobs(site)
+
+# ================= CRAWL ================= #
+
+def crawl(df, linkedin, score=None):
+    """DNS pre-flight, crawl pipeline and LinkedIn fallback for every row of
+    ``df``. Updates the Careers/listing/Job Status columns in place and
+    returns (results, resolvable, not_attempted); ``score(row, site)``
+    orders companies by expected yield. Rows sharing a registrable domain
+    (or a profile on a social site) are crawled once and get that crawl's
+    result (``duplicate_of``)."""
+    results = {}
+    pending = {}
+    scores = {}
+    crawled = set()
+    first = {}       # domains.group_key -> the row crawled for it
+    duplicates = {}  # that row -> rows given its result
+
+    # ---------- DNS PRE-FLIGHT ---------- #
+    dns_cache.install()
+    sites = {i: clean_url(row["Website URL"]) for i, row in df.iterrows()}
+    resolvable = dns_cache.DNS_CACHE.prefetch(site_host(s) for s in sites.values() if s)
+
+    todo = []
     for i, row in df.iterrows():
-        name = str(row["Startup"]).strip().lower()
-        site = clean_url(row["Website URL"])
-        jobs = []
-        career_found = False
+        site = sites[i]
+        results[i] = {"site": site, "jobs": [], "career_found": False}
 
-        if site:
-            career = find_careers_page(site)
-            if career:
-                career_found = True
-                listing = find_listing_page(career)
-                df.at[i, "Careers Page URL"] = career
-                df.at[i, "Job listings page URL"] = listing
-                jobs = scrape_jobs(listing)
+        if site and not resolvable.get(site_host(site)):
+            df.at[i, "Job Status"] = "Invalid Website"
+            results[i]["reason"] = "invalid website (dns)"
+            continue
+        if not site:
+            results[i]["reason"] = "no website"
+            continue
+        key = domains.group_key(site)
+        if key in first:
+            duplicates.setdefault(first[key], []).append(i)
+            continue
+        first[key] = i
+
+        results[i]["reason"] = "not attempted (deadline)"
+        host = affinity_host(row, site)
+        todo.append(((i, site, host), host))
+        if score is not None:
+            scores[(i, site, host)] = score(row, site)
 
-        if not jobs and site:
-            jobs = linkedin_jobs(site)
+    # ---------- PIPELINE ---------- #
+    # companies are fed batched by the host their crawl mostly hits (ATS
+    # board or own site), interleaving hosts so each host's rate limit stays
+    # busy; stages route them by the host each one actually fetches.
+    # Row order is restored by ranking. Nothing new is fed after the deadline.
+    companies = (
+        {"row": i, "site": site, "host": host, "career": None, "listing": None,
+         "jobs": [], "career_found": False, "linkedin_queue": linkedin}
+        for batch in scheduler.host_batches(todo, scores=scores if score is not None else None)
+        for i, site, host in batch
+    )
+    for item in crawl_pipeline().run(companies, stop=lambda: time_left() <= 0):
+        if item.get("skipped"):
+            continue
+        i, site = item["row"], item["site"]
+        result = outcome(item)
+        result["site"] = site
+        crawled.add(i)
+        results[i] = result
+        if result["career_found"]:
+            df.at[i, "Careers Page URL"] = result["career"]
+            df.at[i, "Job listings page URL"] = result["listing"]
+
+        # LinkedIn runs on its own rate-limited queue; the row is filled in
+        # below. A speculative lookup the crawl beat is dropped: only this
+        # company's Future is cancelled, other rows sharing the slug still
+        # get the lookup (a running one still fills the cache).
+        speculative = item.get("linkedin")
+        if result["jobs"]:
+            result["source"] = "career page"
+            for job in result["jobs"]:
+                job["source"] = "career page"
+            if speculative is not None:
+                speculative.cancel()
+        elif speculative is not None:
+            pending[i] = speculative
+        elif linkedin_slug(site) and time_left() > 0:
+            pending[i] = linkedin.submit(linkedin_slug(site), site)
+    not_attempted = [i for (i, _, _), _ in todo if i not in crawled]
 
+    # cached LinkedIn results never went through POSTINGS, so filter here;
+    # lookups still queued when the drain window closes are dropped
+    if _deadline is not None:
+        wait(pending.values(), timeout=max(0, time_left() + DEADLINE_DRAIN))
+    for i, future in sorted(pending.items()):
+        if future.cancelled():
+            results[i]["reason"] += "; linkedin not attempted"
+            continue
+        if _deadline is not None and future.cancel():
+            results[i]["reason"] += "; linkedin not attempted (deadline)"
+            continue
+        found = future.result()
+        if found is None:
+            results[i]["reason"] += "; linkedin unavailable"
+            continue
+        results[i]["jobs"] = [
+            dict(j, source="linkedin") for j in found
+            if POSTINGS.add(j["url"]) and TITLES.add(sites[i], j["title"], j["location"])
+        ]
+        if results[i]["jobs"]:
+            results[i]["source"] = "linkedin"
+            results[i]["complete"] = False   # not the company's own listing
+        results[i]["reason"] += "; " + ("linkedin fallback found jobs" if results[i]["jobs"] else "linkedin empty")
+
+    # ---------- FAN-OUT ---------- #
+    # same jobs (not re-claimed), same site so the store sees one company
+    for i, rows in duplicates.items():
+        for j in rows:
+            results[j] = {**results[i], "duplicate_of": i,
+                          "reason": f"{results[i]['reason']}; same domain as {df.at[i, 'Startup']}"}
+            if results[i]["career_found"]:
+                df.at[j, "Careers Page URL"] = df.at[i, "Careers Page URL"]
+                df.at[j, "Job listings page URL"] = df.at[i, "Job listings page URL"]
+        if i in not_attempted:
+            not_attempted += rows
+
+    return results, resolvable, not_attempted
+
+def write_rows(df, results, not_attempted=(), slots=job_tables.WIDE_SLOTS):
+    """Job columns (for the first ``slots`` jobs, like the long format's
+    Job_List view: --max-postings never widens the frame) and Job Status
+    for each row in ``results``; returns (companies with jobs, total jobs)."""
+    companies_with_jobs = total_jobs = 0
+    for i in results:
+        jobs = results[i]["jobs"]
+        if i in not_attempted:
+            df.at[i, "Job Status"] = "Not Attempted"
+        event_log.emit("decision", company=results[i]["site"], row=i, startup=df.at[i, "Startup"],
+                       status="Found" if jobs else df.at[i, "Job Status"] or "Not Found",
+                       jobs=len(jobs), source=results[i].get("source"), reason=results[i]["reason"])
         if not jobs:
-            df.at[i, "Job Status"] = "Not Found"
-            ranks.append(compute_rank(name, [], career_found))
+            if df.at[i, "Job Status"] not in ("Invalid Website", "Not Attempted"):
+                df.at[i, "Job Status"] = "Not Found"
             continue
 
         companies_with_jobs += 1
-        total_jobs += len(jobs)
+        if "duplicate_of" not in results[i]:
+            total_jobs += len(jobs)
 
-        for idx, job in enumerate(jobs, 1):
+        for idx, job in enumerate(jobs[:slots], 1):
             df.at[i, f"job post{idx} URL"] = job["url"]
             df.at[i, f"job post{idx} title"] = job["title"]
             df.at[i, f"Job {idx} Location"] = job["location"]
-            df.at[i, f"Job {idx} Post Date"] = job["date"]
+            df.at[i, f"Job {idx} Post Date"] = job["date"] or job_date()
 
         df.at[i, "Job Status"] = "Found"
-        ranks.append(compute_rank(name, jobs, career_found))
-        time.sleep(1.5)
+    return companies_with_jobs, total_jobs
+
+def store_results(store, df, results, skip=()):
+    """Record this run's companies and postings in the job store; jobs
+    without a published date get the month they were first seen. Returns
+    the store's {"new", "closed"} counts."""
+    companies = []
+    for i, r in results.items():
+        if i in skip or not r["site"] or r["reason"].startswith("invalid website") or "duplicate_of" in r:
+            continue
+        companies.append({
+            "website": canonical_url(r["site"]),
+            "name": str(df.at[i, "Startup"]),
+            "careers_url": r.get("career"),
+            "listing_url": r.get("listing"),
+            "reason": r["reason"],
+            "jobs": r["jobs"],
+            "complete": bool(r.get("complete")),
+        })
+    with stage("store"):
+        first_seen, changes = store.record(companies)
+    for r in results.values():
+        for job in r["jobs"]:
+            if not job["date"]:
+                job["date"] = job_date(first_seen.get(canonical_url(job["url"])))
+    return changes
+
+def rank_rows(df, results):
+    """``df`` in ranked order; rows without a result rank as empty. Counts
+    are capped at the Job_List's WIDE_SLOTS, which the rank rules are
+    written for, so --max-postings above it cannot demote a company."""
+    slots = job_tables.WIDE_SLOTS
+    with stage("ranking"):
+        found = [results.get(i, {"jobs": [], "career_found": False}) for i in df.index]
+        frame = pd.DataFrame({
+            "name": df["Startup"],
+            "jobs": [min(len(r["jobs"]), slots) for r in found],
+            "complete": [min(sum(j["location"] != "Not Mentioned" for j in r["jobs"]), slots) for r in found],
+            "career_found": [r["career_found"] for r in found],
+            "order": range(len(df)),
+        }, index=df.index)
+        return ranking.sort(df, frame)
+
+# ================= MAIN ================= #
+
+def read_input():
+    df = pd.read_excel(INPUT_FILE).head(INPUT_ROWS)
+    if "Job Status" not in df.columns:
+        df["Job Status"] = ""
+    return df
+
+def run(deadline=None, diff_against=None):
+    """Crawl, rank and export. ``deadline`` (minutes) time-boxes the run:
+    companies go best-expected-yield first and whatever is left at the
+    cut-off is marked Not Attempted. ``diff_against`` (a previous output
+    workbook) adds a Diff sheet of what changed since."""
+    global _deadline
+    if deadline is not None:
+        seconds = deadline * 60
+        _deadline = time.monotonic() + seconds - min(DEADLINE_RESERVE, seconds / 4)
+
+    df = read_input()
+    linkedin = LinkedInQueue(linkedin_lookup)
+    score = None
+    if _deadline is not None:
+        history = load_history(OUTPUT_FILE)
+        score = lambda row, site: expected_yield(row, history.get(site_host(site)))
+    previous = None
+    if diff_against:
+        try:
+            previous = run_diff.load_run(diff_against)   # read now: OUTPUT_FILE is overwritten below
+        except Exception as e:
+            print(f"⚠️ No diff: cannot read {diff_against} ({type(e).__name__})")
+
+    results, resolvable, not_attempted = crawl(df, linkedin, score)
+    linkedin.close()
+    budget_hits = sum(r.get("budget_hit", False) for r in results.values() if "duplicate_of" not in r)
+    duplicates = sum("duplicate_of" in r for r in results.values())
+    changes = {"new": "n/a", "closed": "n/a"}
+    if STORE_FILE:
+        store = job_store.JobStore(STORE_FILE)
+        try:
+            changes = store_results(store, df, results, not_attempted)
+        finally:
+            store.close()
+
+    # long format keeps postings out of the frame: they are streamed from
+    # ``results`` into the Postings sheet and the Job_List view at export
+    long_format = OUTPUT_FORMAT == "long"
+    companies_with_jobs, total_jobs = write_rows(df, results, not_attempted, slots=0 if long_format else job_tables.WIDE_SLOTS)
+    skipped_names = [str(df.at[i, "Startup"]) for i in not_attempted]
+    df = rank_rows(df, results)
+    diff = None
+    if previous is not None:
+        with stage("diff"):
+            diff = run_diff.diff_runs(previous, run_diff.index_long(
+                job_tables.companies(df, results), job_tables.postings(df, results)))
+
+    # ================= METRICS ================= #
 
-    df["_rank"] = ranks
-    df = df.sort_values("_rank").drop(columns="_rank")
+    for cache, hits, misses in [
+        ("dns", dns_cache.DNS_CACHE.hits, dns_cache.DNS_CACHE.misses),
+        ("linkedin", linkedin.hits, linkedin.misses),
+    ]:
+        METRICS.inc("cache_requests_total", hits, cache=cache, result="hit")
+        METRICS.inc("cache_requests_total", misses, cache=cache, result="miss")
+
+    stage_table = pd.DataFrame(METRICS.stage_rows())
+    counters = []
+    for cache in ["dns", "page", "linkedin"]:
+        hits = METRICS.counter("cache_requests_total", cache=cache, result="hit")
+        total = hits + METRICS.counter("cache_requests_total", cache=cache, result="miss")
+        counters.append((f"{cache} cache hit rate", f"{hits / total:.0%} of {total}" if total else "n/a"))
+    early = METRICS.counter("incremental_parse_total", result="early_exit")
+    streamed = early + METRICS.counter("incremental_parse_total", result="full_parse")
+    counters.append(("listing pages cut short (MAX_JOBS reached)", f"{early} of {streamed}"))
+    counters.append(("further listing pages fetched (pagination)", METRICS.counter("pagination_pages_total")))
+    for name in ["feed"] + list(STAGE_WORKERS):
+        blocked = METRICS.counter("pipeline_blocked_seconds_total", stage=name)
+        counters.append((f"pipeline: {name} blocked on full queue (s)", round(blocked, 2)))
+    errors = {}
+    for (name, labels), value in METRICS.counters.items():
+        if name == "http_errors_total":
+            errors[dict(labels)["error"]] = errors.get(dict(labels)["error"], 0) + value
+    counters += [(f"errors: {k}", v) for k, v in sorted(errors.items())]
+    counter_table = pd.DataFrame(counters, columns=["Counter", "Value"])
 
     # ================= METHODOLOGY SHEET ================= #
 
     methodology = pd.DataFrame({
         "Methodology": [
-            "1. Read startup name & website",
+            "1. Read startup name & website, pre-resolve all hosts (DNS), crawl each registrable domain once",
             "2. Detect career page via keywords & paths",
             "3. Follow ATS links (Lever, Greenhouse, Ashby, Workable, Zoho)",
-            "4. Scrape real job postings only (filters applied)",
-            "5. Extract title, location, month-year date",
-            "6. Fallback to LinkedIn job pages",
+            "4. Scrape real job postings only (filters applied; inline SPA state and ATS JSON feeds read without a browser)",
+            "5. Extract title, location, month-year date (schema.org JobPosting first)",
+            "6. Fallback to LinkedIn job pages (rate-limited queue, cached per slug); started early "
+            f"alongside crawls with no careers page or running over {SPECULATE_AFTER}s, first to fill the slots wins",
             "7. Rank companies by job completeness",
+            f"8. Per-company budget {COMPANY_BUDGET}s, adaptive per-host timeouts",
+            "9. Staged pipeline with bounded queues ("
+            + ", ".join(f"{name} x{n}" for name, n in STAGE_WORKERS.items())
+            + f"), companies batched by host and interleaved across hosts "
+            f"(>= {http_client.HOST_INTERVAL}s between requests to one host)",
             "",
             "Summary",
             f"Total Companies Processed: {len(df)}",
             f"Companies With Jobs: {companies_with_jobs}",
             f"Companies Without Jobs: {len(df) - companies_with_jobs}",
-            f"Total Jobs Found: {total_jobs}"
+            f"Invalid Websites (DNS): {sum(not ok for ok in resolvable.values())}",
+            f"Duplicate Websites (same domain, crawled once): {duplicates}",
+            f"Total Jobs Found: {total_jobs}",
+            f"Companies Hitting Latency Budget: {budget_hits}",
+            f"LinkedIn Lookups (cached / fetched): {linkedin.hits} / {linkedin.misses}",
+            f"LinkedIn Started Speculatively / Won Race: {METRICS.counter('linkedin_speculative_total'):.0f}"
+            f" / {METRICS.counter('linkedin_speculative_won_total'):.0f}",
+            f"New Postings Since Last Run: {changes['new']}",
+            f"Postings Closed Since Last Run: {changes['closed']}",
+            f"Not Attempted (deadline): {len(skipped_names)}"
+            + (f" - {', '.join(skipped_names)}" if skipped_names else ""),
+            f"Changes Since Previous Output: {run_diff.summary(diff) if diff is not None else 'n/a'}",
         ]
     })
 
-    with pd.ExcelWriter(OUTPUT_FILE, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Job_List")
-        methodology.to_excel(writer, index=False, sheet_name="Methodology")
+    if long_format:
+        sheets = [
+            ("Job_List", [job_tables.wide(df, results, default_date=job_date())]),
+            ("Companies", [job_tables.companies(df, results)]),
+            ("Postings", [job_tables.postings(df, results, default_date=job_date())]),
+        ]
+    else:
+        sheets = [("Job_List", [job_tables.frame(df)])]
+    sheets.append(("Methodology", [job_tables.frame(t) for t in (methodology, stage_table, counter_table)]))
+    if diff is not None:
+        sheets.append((run_diff.DIFF_SHEET, [job_tables.frame(diff)]))
+    with stage("export"):
+        job_tables.write_workbook(OUTPUT_FILE, sheets)
+
+    METRICS.write(METRICS_JSON, METRICS_PROM)
 
     print("✅ Job scraping + ranking + methodology completed")
 
+def main(argv=None):
+    global STORE_FILE, OUTPUT_FORMAT, MAX_JOBS
+    parser = argparse.ArgumentParser(description="Career + ATS + LinkedIn job scraper")
+    parser.add_argument("--workers", default="",
+                        help="threads per pipeline stage, e.g. 'discover=16,extract=4' "
+                             "(a bare number sets discover)")
+    parser.add_argument("--deadline", type=float, metavar="MINUTES",
+                        help="time-box the run: highest expected yield first, "
+                             "unfinished companies marked Not Attempted")
+    parser.add_argument("--diff", nargs="?", const=OUTPUT_FILE, metavar="WORKBOOK",
+                        help=f"add a Diff sheet against a previous output (default {OUTPUT_FILE}, "
+                             "i.e. the run being overwritten)")
+    parser.add_argument("--format", choices=["wide", "long"], default=OUTPUT_FORMAT,
+                        help="long: one row per posting (Postings) and per company (Companies), "
+                             f"Job_List kept as a {job_tables.WIDE_SLOTS}-slot view")
+    parser.add_argument("--max-postings", type=int, default=MAX_JOBS, metavar="N",
+                        help="postings kept per company (0 = all)")
+    parser.add_argument("--no-http2", action="store_true",
+                        help="use HTTP/1.1 for every host, even with httpx[http2] installed")
+    parser.add_argument("--store", default=STORE_FILE,
+                        help="SQLite posting history ('' to disable)")
+    parser.add_argument("--events", default=EVENT_LOG_FILE,
+                        help="JSON-lines event log path ('' to disable)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"profile the run; writes {PROFILE_REPORT} and {PROFILE_COLLAPSED}")
+    parser.add_argument("--profile-top", type=int, default=profiling.TOP_N,
+                        help="rows per section of the profile report")
+    args = parser.parse_args(argv)
+    for part in filter(None, args.workers.split(",")):
+        name, _, n = part.rpartition("=")
+        if (name or "discover") not in STAGE_WORKERS:
+            parser.error(f"unknown pipeline stage {name!r}")
+        STAGE_WORKERS[name or "discover"] = max(1, int(n))
+    http_client.HTTP2_ENABLED = not args.no_http2
+    STORE_FILE = args.store
+    OUTPUT_FORMAT = args.format
+    MAX_JOBS = args.max_postings or None
+
+    if args.events:
+        event_log.open_log(args.events)
+    try:
+        if args.profile:
+            with profiling.profile(PROFILE_REPORT, PROFILE_COLLAPSED, top_n=args.profile_top):
+                run(args.deadline, args.diff)
+            print(f"📊 Profile written to {PROFILE_REPORT} and {PROFILE_COLLAPSED}")
+        else:
+            run(args.deadline, args.diff)
+    finally:
+        http_client.close()
+        event_log.close_log()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+
+# ================= LOCAL H2 SERVER ================= #
+#
+# Benchmarks http_client.get() over HTTP/1.1 (requests, one connection per
+# worker thread) against the shared HTTP/2 client on a local TLS server that
+# speaks h2 and http/1.1.
+#
+#   pip install "httpx[http2]" hypercorn
+#   python bench_http2.py --requests 2000 --concurrency 100 --delay 0.02
+
+BODY = b"<html><body>" + b"<a href='/jobs/1'>Backend Engineer</a>" * 50 + b"</body></html>"
+
+def make_app(delay, seen):
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+        seen["connections"].add(tuple(scope["client"]))
+        seen["protocols"][scope["http_version"]] += 1
+        await asyncio.sleep(delay)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/html"), (b"content-length", str(len(BODY)).encode())]})
+        await send({"type": "http.response.body", "body": BODY})
+    return app
+
+def start_server(port, delay, seen, certdir):
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    cert, key = os.path.join(certdir, "cert.pem"), os.path.join(certdir, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+                   check=True, capture_output=True)
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.certfile, config.keyfile = cert, key
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.loglevel = "WARNING"
+
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    thread = threading.Thread(
+        target=lambda: loop.run_until_complete(serve(make_app(delay, seen), config, shutdown_trigger=stop.wait)),
+        daemon=True)
+    thread.start()
+    time.sleep(1.0)
+    return lambda: loop.call_soon_threadsafe(stop.set)
+
+# ================= BENCHMARK ================= #
+
+def run(url, total, concurrency, seen):
+    seen["connections"].clear()
+    seen["protocols"].clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        ok = sum(r is not None and r.status_code == 200 for r in pool.map(lambda _: http_client.get(url), range(total)))
+    elapsed = time.perf_counter() - start
+    return ok, elapsed, len(seen["connections"]), dict(seen["protocols"])
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/1.1 vs HTTP/2 fetch-layer benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.02, help="server-side latency per request (s)")
+    parser.add_argument("--port", type=int, default=8443)
+    args = parser.parse_args()
+
+    import urllib3
+    urllib3.disable_warnings()
+    http_client.TLS_VERIFY = False          # self-signed localhost certificate
+    http_client.HTTP2_HOSTS.add("localhost")
+    http_client.MAX_ATTEMPTS = 1
+    http_client.HOST_INTERVAL = 0            # measure the transport, not the politeness limit
+
+    seen = {"connections": set(), "protocols": Counter()}
+    with tempfile.TemporaryDirectory() as certdir:
+        stop = start_server(args.port, args.delay, seen, certdir)
+        url = f"https://localhost:{args.port}/jobs"
+        try:
+            for label, enabled in (("HTTP/1.1 (requests)", False), ("HTTP/2 (httpx)", True)):
+                http_client.HTTP2_ENABLED = enabled
+                if enabled and not http_client.uses_http2("localhost"):
+                    print(f"{label:>20}: skipped (pip install 'httpx[http2]')")
+                    continue
+                ok, elapsed, conns, protocols = run(url, args.requests, args.concurrency, seen)
+                print(f"{label:>20}: {ok}/{args.requests} ok in {elapsed:6.2f}s  "
+                      f"{args.requests / elapsed:8.1f} req/s  {conns:4d} connections  {protocols}")
+        finally:
+            http_client.close()
+            stop()
+
+if __name__ == "__main__":
+    main()
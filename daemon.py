@@ -0,0 +1,257 @@
+import argparse
+import heapq
+import json
+import os
+import random
+import re
+import time
+
+import pandas as pd
+
+import Final_PM_Scraper as scraper
+import event_log
+import http_client
+import job_store
+from dedup import DedupIndex, NearDuplicateIndex, canonical_url
+from linkedin_queue import LinkedInQueue
+from metrics import METRICS
+
+# ================= CONFIG ================= #
+#
+# Long-running mode: companies are re-crawled when due, and each company's
+# refresh interval shrinks while its job set keeps changing and grows while
+# it stays the same.
+#
+#   python daemon.py                      # run until Ctrl+C
+#   python daemon.py --once               # crawl what is due now, write, exit (cron)
+
+STATE_FILE = "daemon_state.json"
+OUTPUT_FILE = "Output_Daemon.xlsx"
+
+DAY = 24 * 3600
+MIN_INTERVAL = 1 * DAY
+MAX_INTERVAL = 30 * DAY
+INITIAL_INTERVAL = 7 * DAY
+SPEEDUP = 0.5        # interval multiplier after a check that found changes
+SLOWDOWN = 1.5       # ... and after one that found none
+JITTER = 0.1         # +-10%, so companies added together drift apart
+MAX_PER_CYCLE = 50   # companies crawled per wake-up
+WRITE_EVERY = 3600   # seconds between workbook writes
+POLL = 60            # longest sleep between due checks
+# reasons of checks that did not see the company's jobs (site or listing
+# unreachable, throttled, out of budget): rescheduled, never a "change"
+FAILED_CHECKS = ("homepage unreachable", "error (", "budget exhausted", "linkedin unavailable",
+                 "not attempted", "invalid website")
+
+JOB_COLUMN = re.compile(r"^(job post\d+ (URL|title)|Job \d+ (Location|Post Date))$")
+
+# ================= SCHEDULE ================= #
+
+class RefreshSchedule:
+    """Companies in a min-heap keyed by next-due time; each carries its own
+    refresh interval and last result, persisted to ``path``."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.state = self._load()
+        self._heap = []
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def add(self, key):
+        entry = self.state.setdefault(key, {"interval": INITIAL_INTERVAL, "due": 0, "checks": 0,
+                                            "changes": 0, "failures": 0, "jobs": [], "result": None})
+        heapq.heappush(self._heap, (entry["due"], key))
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now, limit=MAX_PER_CYCLE):
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def record(self, key, result, now):
+        """Store a check's result and reschedule: the first check is the
+        baseline, later ones halve or stretch the interval. A failed check
+        keeps the last good result and is retried at the current interval."""
+        entry = self.state[key]
+        if not check_succeeded(result):
+            entry.update(
+                failures=entry.get("failures", 0) + 1,
+                checked=now,
+                due=now + entry["interval"] * random.uniform(1 - JITTER, 1 + JITTER),
+            )
+            heapq.heappush(self._heap, (entry["due"], key))
+            METRICS.inc("daemon_checks_total", changed="failed")
+            return False
+        urls = sorted(canonical_url(j["url"]) for j in result["jobs"])
+        changed = entry["checks"] > 0 and urls != entry["jobs"]
+        if entry["checks"]:
+            factor = SPEEDUP if changed else SLOWDOWN
+            entry["interval"] = max(MIN_INTERVAL, min(MAX_INTERVAL, entry["interval"] * factor))
+        entry.update(
+            jobs=urls,
+            result=result,
+            checks=entry["checks"] + 1,
+            changes=entry["changes"] + changed,
+            checked=now,
+            due=now + entry["interval"] * random.uniform(1 - JITTER, 1 + JITTER),
+        )
+        heapq.heappush(self._heap, (entry["due"], key))
+        METRICS.inc("daemon_checks_total", changed=str(changed).lower())
+        return changed
+
+def check_succeeded(result):
+    """Whether a check saw the company's current jobs: nothing failed on
+    the way, and a listing it found was fetched (LinkedIn answering first
+    counts)."""
+    reason = result.get("reason") or ""
+    if any(mark in reason for mark in FAILED_CHECKS):
+        return False
+    return bool(result.get("fetched")) or not result.get("listing") or reason.startswith("linkedin answered first")
+
+# ================= CYCLE ================= #
+
+def crawl_due(df, schedule, rows_by_key, linkedin, store=None, limit=MAX_PER_CYCLE):
+    """Run the companies due now through the scraper's pipeline."""
+    due = schedule.pop_due(time.time(), limit)
+    if not due:
+        return 0
+    rows = [rows_by_key[key][0] for key in due]
+    sub = df.loc[rows].copy()
+    sub["Job Status"] = ""
+
+    # a fresh crawl: postings claimed on earlier cycles are fair game again
+    scraper.POSTINGS = DedupIndex(scraper.DEDUP_BLOOM_CAPACITY)
+    scraper.TITLES = NearDuplicateIndex()
+    with scraper._pages_lock:
+        scraper._pages.clear()
+
+    results, _, _ = scraper.crawl(sub, linkedin)
+    if store is not None:
+        scraper.store_results(store, sub, results)
+    now = time.time()
+    changed = 0
+    columns = [c for c in ("Careers Page URL", "Job listings page URL", "Job Status") if c in sub.columns]
+    for col in columns:   # an all-empty column reads (or is created) as float
+        df[col] = df[col].astype(object) if col in df.columns else None
+    for key, i in zip(due, rows):
+        result = {k: results[i].get(k) for k in ("site", "career", "listing", "jobs", "career_found", "reason",
+                                                 "source", "fetched", "complete")}
+        changed += schedule.record(key, result, now)
+        if not check_succeeded(result):
+            continue   # the row keeps its last good check
+        for j in rows_by_key[key]:
+            for col in columns:
+                df.at[j, col] = sub.at[i, col]
+    print(f"🔁 {len(due)} companies checked, {changed} changed; next due "
+          f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(schedule.next_due()))}")
+    return len(due)
+
+def write_workbook(df, schedule, rows_by_key, path=OUTPUT_FILE):
+    """Ranked Job_List from every company's latest result, plus a Refresh
+    sheet with each company's interval and next check."""
+    out = df.copy()
+    results = {}
+    for key, rows in rows_by_key.items():
+        result = schedule.state[key]["result"]
+        if result is not None:
+            for i in rows:
+                results[i] = result
+    stale = [c for c in out.columns if JOB_COLUMN.match(str(c))]
+    out.loc[list(results), stale] = None
+    scraper.write_rows(out, results)
+    out = scraper.rank_rows(out, results)
+
+    refresh = pd.DataFrame([
+        {
+            "Website": key,
+            "Checks": entry["checks"],
+            "Changes": entry["changes"],
+            "Failed Checks": entry.get("failures", 0),
+            "Interval (days)": round(entry["interval"] / DAY, 1),
+            "Last Checked": time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["checked"])) if entry.get("checked") else "",
+            "Next Due": time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["due"])),
+        }
+        for key, entry in sorted(schedule.state.items(), key=lambda kv: kv[1]["due"])
+        if key in rows_by_key
+    ])
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        out.to_excel(writer, index=False, sheet_name="Job_List")
+        refresh.to_excel(writer, index=False, sheet_name="Refresh")
+    METRICS.write(scraper.METRICS_JSON, scraper.METRICS_PROM)
+    print(f"✅ {path} written")
+
+# ================= MAIN ================= #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Continuous job crawl with adaptive refresh intervals")
+    parser.add_argument("--input", default=scraper.INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--max-per-cycle", type=int, default=MAX_PER_CYCLE)
+    parser.add_argument("--write-every", type=float, default=WRITE_EVERY, help="seconds between workbook writes")
+    parser.add_argument("--store", default=scraper.STORE_FILE, help="SQLite posting history ('' to disable)")
+    parser.add_argument("--events", default=scraper.EVENT_LOG_FILE, help="JSON-lines event log path ('' to disable)")
+    parser.add_argument("--once", action="store_true", help="crawl what is due, write the workbook and exit")
+    args = parser.parse_args(argv)
+
+    df = pd.read_excel(args.input)
+    if "Job Status" not in df.columns:
+        df["Job Status"] = ""
+    rows_by_key = {}
+    for i, row in df.iterrows():
+        site = scraper.clean_url(row["Website URL"])
+        if site:
+            rows_by_key.setdefault(canonical_url(site), []).append(i)
+
+    schedule = RefreshSchedule(args.state)
+    for key in rows_by_key:
+        schedule.add(key)
+
+    if args.events:
+        event_log.open_log(args.events)
+    linkedin = LinkedInQueue(scraper.linkedin_lookup)
+    store = job_store.JobStore(args.store) if args.store else None
+    last_write, dirty = time.monotonic(), False
+    try:
+        while True:
+            if crawl_due(df, schedule, rows_by_key, linkedin, store, args.max_per_cycle):
+                schedule.save()
+                linkedin.save()
+                dirty = True
+            if args.once:
+                break
+            if dirty and time.monotonic() - last_write >= args.write_every:
+                write_workbook(df, schedule, rows_by_key, args.output)
+                last_write, dirty = time.monotonic(), False
+            if schedule.next_due() is None or schedule.next_due() > time.time():
+                time.sleep(min(POLL, max(1, (schedule.next_due() or 0) - time.time())))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if dirty:
+            write_workbook(df, schedule, rows_by_key, args.output)
+        schedule.save()
+        linkedin.close()
+        if store is not None:
+            store.close()
+        http_client.close()
+        event_log.close_log()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import hashlib
+import math
+import random
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ================= CONFIG ================= #
+
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_hsenc", "_hsmi",
+    "ref", "referrer", "source", "src", "trk", "trackingid", "refid",
+    "gh_src", "lever-source", "lever-origin",
+}
+
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "eng": "engineer",
+    "engg": "engineer", "mgr": "manager", "dev": "developer", "mgmt": "management",
+    "exec": "executive", "assoc": "associate", "ops": "operations",
+}
+TITLE_NOISE = {
+    "a", "an", "and", "the", "of", "for", "with", "in", "at", "m", "f", "d", "x",
+    "remote", "hybrid", "onsite", "on", "site", "full", "time", "fulltime",
+    "not", "mentioned", "job", "opening",
+}
+
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 16               # 16 bands x 2 rows: candidates from ~25% Jaccard
+NEAR_DUP_THRESHOLD = 0.7     # exact Jaccard needed to call two titles the same
+
+# ================= CANONICAL URLS ================= #
+
+def canonical_url(url):
+    """Normalize a URL so equivalent forms compare equal: https, no www,
+    no default port, no fragment, no tracking params, sorted query,
+    no trailing slash."""
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = "/".join(p for p in parts.path.split("/") if p)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit(("https", host, "/" + path, urlencode(query), ""))
+
+def _digest(key):
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+# ================= BLOOM FILTER ================= #
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` keys at ``error_rate``."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add_digest(self, digest):
+        """Set the key's bits; True if any bit was newly set (key was new)."""
+        new = False
+        for p in self._positions(digest):
+            byte, bit = divmod(p, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        return new
+
+    def contains_digest(self, digest):
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(digest))
+
+# ================= DEDUP INDEX ================= #
+
+class DedupIndex:
+    """Run-wide set of canonical URLs. Exact (set of 64-bit hashes) by
+    default; pass ``bloom_capacity`` for bounded memory on very large crawls,
+    at the cost of rare false 'already seen' answers."""
+
+    def __init__(self, bloom_capacity=None, error_rate=0.001):
+        self.bloom = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else None
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def _key(self, url):
+        canon = canonical_url(url)
+        return _digest(canon) if canon else None
+
+    def add(self, url):
+        """Record ``url``; True if no equivalent URL was seen before."""
+        digest = self._key(url)
+        if digest is None:
+            return False
+        with self._lock:
+            if self.bloom is not None:
+                return self.bloom.add_digest(digest)
+            key = int.from_bytes(digest[:8], "little")
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def __contains__(self, url):
+        digest = self._key(url)
+        if digest is None:
+            return False
+        with self._lock:
+            if self.bloom is not None:
+                return self.bloom.contains_digest(digest)
+            return int.from_bytes(digest[:8], "little") in self._keys
+
+# ================= NEAR-DUPLICATE TITLES ================= #
+
+def title_tokens(title, location=None):
+    """Normalized token set of a posting's title and location."""
+    text = f"{title or ''} {location or ''}".lower()
+    tokens = set()
+    for word in re.findall(r"[a-z0-9+#]+", text):
+        word = TITLE_ABBREVIATIONS.get(word, word)
+        if word not in TITLE_NOISE:
+            tokens.add(word)
+    return frozenset(tokens)
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(_MERSENNE))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+
+@lru_cache(maxsize=65536)
+def _token_hashes(token):
+    # title vocabularies are small, so each token's permutations are cached
+    h = int.from_bytes(_digest(token)[:8], "little")
+    return tuple((a * h + b) % _MERSENNE for a, b in _PERMUTATIONS)
+
+def minhash(tokens):
+    return tuple(map(min, zip(*map(_token_hashes, tokens))))
+
+class NearDuplicateIndex:
+    """MinHash + LSH banding over title/location token sets. Lookups only
+    compare against postings sharing a band bucket within the same scope
+    (e.g. one company), so cost stays near-linear in the number of postings."""
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self._buckets = defaultdict(list)
+        self._tokens = []
+        self._lock = threading.Lock()
+
+    def _band_keys(self, scope, signature):
+        r = self.rows
+        return [(scope, b, signature[b * r:(b + 1) * r]) for b in range(self.bands)]
+
+    def add(self, scope, title, location=None):
+        """Record a posting; False if it near-duplicates one already in ``scope``."""
+        tokens = title_tokens(title, location)
+        if not tokens:
+            return True
+        keys = self._band_keys(scope, minhash(tokens))
+        with self._lock:
+            seen = set()
+            for key in keys:
+                for idx in self._buckets.get(key, ()):
+                    if idx in seen:
+                        continue
+                    seen.add(idx)
+                    other = self._tokens[idx]
+                    if len(tokens & other) / len(tokens | other) >= self.threshold:
+                        return False
+            idx = len(self._tokens)
+            self._tokens.append(tokens)
+            for key in keys:
+                self._buckets[key].append(idx)
+            return True
@@ -0,0 +1,112 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ================= CONFIG ================= #
+
+DNS_TTL = 300            # seconds a successful lookup is reused
+DNS_NEGATIVE_TTL = 60    # seconds an NXDOMAIN / timeout is remembered
+DNS_WORKERS = 32
+DNS_RETRIES = 2          # extra tries after a temporary resolver failure (EAI_AGAIN etc.)
+DNS_RETRY_DELAY = 0.5    # seconds, doubled per retry
+
+# only these mean the name does not exist; anything else may succeed later
+NXDOMAIN_ERRORS = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+_system_getaddrinfo = socket.getaddrinfo
+
+# ================= CACHE ================= #
+
+class DNSCache:
+    """In-process TTL cache of getaddrinfo() results, keyed by host."""
+
+    def __init__(self, ttl=DNS_TTL, negative_ttl=DNS_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, host):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry and entry[1] > now:
+                self.hits += 1
+                return True, entry[0]
+            self.misses += 1
+        for attempt in range(DNS_RETRIES + 1):
+            try:
+                infos = _system_getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+                break
+            except UnicodeError:
+                infos = None
+                break
+            except socket.gaierror as e:
+                if e.errno in NXDOMAIN_ERRORS:
+                    infos = None
+                    break
+                if attempt == DNS_RETRIES:
+                    raise   # temporary failure: not cached, the next lookup tries again
+                time.sleep(DNS_RETRY_DELAY * 2 ** attempt)
+        expires = now + (self.ttl if infos else self.negative_ttl)
+        with self._lock:
+            self._entries[host] = (infos, expires)
+        return False, infos
+
+    def resolve(self, host):
+        """Return cached address infos for ``host`` or None if it does not
+        exist; raises socket.gaierror if the resolver keeps failing."""
+        return self._lookup(host.lower())[1]
+
+    def prefetch(self, hosts, workers=DNS_WORKERS):
+        """Resolve ``hosts`` in parallel; returns {host: resolvable}."""
+        hosts = sorted({h.lower() for h in hosts if h})
+        if not hosts:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(workers, len(hosts))) as pool:
+            found = pool.map(self._resolvable, hosts)
+        return dict(zip(hosts, found))
+
+    def _resolvable(self, host):
+        try:
+            return bool(self.resolve(host))
+        except socket.gaierror:
+            return True   # resolver trouble, not a bad name: let the crawl try it
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo backed by the cache."""
+        if not isinstance(host, str) or flags or _is_ip(host):
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+        infos = self.resolve(host)
+        if not infos:
+            raise socket.gaierror(socket.EAI_NONAME, f"Name or service not known: {host}")
+        port = int(port) if port is not None else 0
+        result = []
+        for fam, typ, pro, canon, addr in infos:
+            if family and fam != family:
+                continue
+            result.append((fam, type or typ, proto or pro, canon, (addr[0], port) + tuple(addr[2:])))
+        if not result:
+            raise socket.gaierror(socket.EAI_FAMILY, f"No address of requested family for {host}")
+        return result
+
+
+def _is_ip(host):
+    for fam in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(fam, host.strip("[]"))
+            return True
+        except (OSError, ValueError):
+            pass
+    return False
+
+
+DNS_CACHE = DNSCache()
+
+def install(cache=DNS_CACHE):
+    """Route every socket.getaddrinfo call (requests/urllib3 included) through ``cache``."""
+    socket.getaddrinfo = cache.getaddrinfo
+    return cache
@@ -0,0 +1,135 @@
+from urllib.parse import urlsplit
+
+from dns_cache import _is_ip
+
+# ================= CONFIG ================= #
+#
+# Trimmed public-suffix list (publicsuffix.org format): the multi-label
+# suffixes startup websites actually sit under, plus shared hosting
+# platforms where every subdomain is a different owner. Any other TLD is
+# a one-label suffix (the list's implicit "*" rule).
+
+PUBLIC_SUFFIXES = """
+// ICANN: second-level registrations under country codes
+ac.in co.in edu.in firm.in gen.in gov.in ind.in net.in org.in res.in
+co.uk ac.uk gov.uk ltd.uk me.uk net.uk org.uk plc.uk
+com.au net.au org.au edu.au gov.au id.au
+co.nz net.nz org.nz ac.nz govt.nz
+com.sg net.sg org.sg edu.sg gov.sg per.sg
+com.my net.my org.my edu.my gov.my
+co.id or.id ac.id web.id my.id
+com.ph net.ph org.ph
+com.vn net.vn org.vn
+co.th in.th ac.th or.th
+com.hk org.hk net.hk edu.hk
+com.tw org.tw net.tw
+com.cn net.cn org.cn edu.cn gov.cn
+co.jp ne.jp or.jp ac.jp go.jp
+co.kr or.kr ne.kr ac.kr
+com.pk net.pk org.pk
+com.np org.np
+com.lk org.lk
+co.ke or.ke ac.ke
+com.ng org.ng edu.ng
+co.za org.za net.za ac.za gov.za
+com.eg org.eg
+co.il org.il ac.il
+com.tr org.tr net.tr
+com.sa net.sa org.sa
+com.ae net.ae org.ae
+com.br net.br org.br
+com.mx org.mx
+com.ar org.ar
+com.co net.co org.co
+com.pe org.pe
+co.ve com.ve
+com.es org.es nom.es
+co.at or.at
+com.pl net.pl org.pl
+co.it
+com.de
+com.ua org.ua
+// ICANN: wildcard and exception rules
+*.ck !www.ck
+*.bd
+// private: shared hosting where each subdomain is its own site
+github.io gitlab.io herokuapp.com vercel.app netlify.app pages.dev web.app firebaseapp.com
+webflow.io wixsite.com squarespace.com notion.site framer.website framer.ai carrd.co
+azurewebsites.net cloudfront.net appspot.com blogspot.com wordpress.com myshopify.com
+"""
+
+# Social and profile sites some rows give as their website: one registrable
+# domain, a different company per profile. Rows on them group by profile
+# (facebook.com/acme, linkedin.com/company/acme), not by domain; leading
+# path segments in PROFILE_PREFIXES are kept as part of the profile.
+PROFILE_HOSTS = {
+    "facebook.com", "fb.com", "instagram.com", "linkedin.com", "twitter.com", "x.com",
+    "youtube.com", "tiktok.com", "pinterest.com", "medium.com", "substack.com",
+    "github.com", "linktr.ee", "wellfound.com", "angel.co", "crunchbase.com",
+}
+PROFILE_PREFIXES = {"company", "school", "showcase", "in", "pages", "pg", "channel", "c", "user",
+                    "organization", "companies", "people"}
+
+# ================= RULES ================= #
+
+def load_rules(text):
+    """(rules, wildcards, exceptions) from public-suffix-list text."""
+    rules, wildcards, exceptions = set(), set(), set()
+    for line in text.splitlines():
+        line = line.split("//", 1)[0]
+        for rule in line.split():
+            rule = rule.lower()
+            if rule.startswith("!"):
+                exceptions.add(rule[1:])
+            elif rule.startswith("*."):
+                wildcards.add(rule[2:])
+            else:
+                rules.add(rule)
+    return rules, wildcards, exceptions
+
+_RULES = load_rules(PUBLIC_SUFFIXES)
+
+def public_suffix(host, rules=_RULES):
+    """Longest matching public suffix of ``host`` (exception rules win)."""
+    suffixes, wildcards, exceptions = rules
+    labels = host.split(".")
+    for n in range(len(labels)):   # longest candidate first
+        candidate = ".".join(labels[n:])
+        if candidate in exceptions:
+            return ".".join(labels[n + 1:])
+        if n > 0 and candidate in wildcards:
+            return ".".join(labels[n - 1:])
+        if candidate in suffixes:
+            return candidate
+    return labels[-1]
+
+def registrable_domain(host, rules=_RULES):
+    """The part of ``host`` a company registers: public suffix plus one
+    label (jobs.acme.co.in -> acme.co.in). IPs and single-label hosts are
+    returned as they are."""
+    if not host:
+        return None
+    host = host.strip().rstrip(".").lower()
+    if _is_ip(host) or "." not in host:
+        return host
+    suffix = public_suffix(host, rules)
+    if host == suffix:
+        return host
+    return ".".join(host.split(".")[-(suffix.count(".") + 2):])
+
+def group_key(url, rules=_RULES):
+    """Key under which rows are the same company: the registrable domain,
+    plus the profile path on PROFILE_HOSTS (facebook.com/acme)."""
+    try:
+        parts = urlsplit(url)
+        domain = registrable_domain(parts.hostname, rules)
+    except ValueError:
+        return None
+    if domain not in PROFILE_HOSTS:
+        return domain
+    profile = []
+    for segment in (s.lower() for s in parts.path.split("/") if s):
+        profile.append(segment)
+        if segment not in PROFILE_PREFIXES:
+            break
+    return "/".join([domain] + profile)
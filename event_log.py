@@ -0,0 +1,92 @@
+import contextvars
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# ================= CONFIG ================= #
+
+FLUSH_INTERVAL = 1.0      # seconds between writer flushes
+BATCH_SIZE = 500          # events drained per write
+QUEUE_SIZE = 100_000      # events beyond this are dropped, never block
+
+_company = contextvars.ContextVar("company", default=None)
+_log = None
+
+# ================= WRITER ================= #
+
+class EventLog:
+    """JSON-lines event stream written by a background thread. ``emit`` only
+    enqueues, so callers never wait on disk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._file = open(path, "a", encoding="utf-8", buffering=1 << 16)
+        self._thread = threading.Thread(target=self._write, name="event-log", daemon=True)
+        self._thread.start()
+
+    def emit(self, event, **fields):
+        record = {"ts": round(time.time(), 6), "event": event, "company": _company.get()}
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                batch = [self._queue.get(timeout=FLUSH_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = any(r is None for r in batch)
+            lines = [json.dumps(r, default=str) for r in batch if r is not None]
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+            if closing or time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                self._file.flush()
+                last_flush = time.monotonic()
+            if closing:
+                return
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+# ================= MODULE API ================= #
+
+def open_log(path):
+    global _log
+    _log = EventLog(path)
+    return _log
+
+def close_log():
+    global _log
+    log, _log = _log, None
+    if log is not None:
+        log.close()
+
+def emit(event, **fields):
+    """Record one event; a no-op when no log is open."""
+    log = _log
+    if log is not None:
+        log.emit(event, **fields)
+
+@contextmanager
+def company(company_id):
+    """Tag every event emitted in this context with ``company_id``."""
+    token = _company.set(company_id)
+    try:
+        yield
+    finally:
+        _company.reset(token)
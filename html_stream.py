@@ -0,0 +1,76 @@
+import re
+from html.parser import HTMLParser
+
+from structured_data import STATE_GLOBALS
+
+# ================= CONFIG ================= #
+
+STRUCTURED_SCRIPT_TYPES = ("application/ld+json", "application/json")
+STATE_SCRIPT_IDS = ("__NEXT_DATA__", "__NUXT_DATA__")
+JOBPOSTING_ITEMTYPE = re.compile(r"schema\.org/JobPosting", re.I)
+
+# ================= ANCHOR PARSER ================= #
+
+class AnchorParser(HTMLParser):
+    """Event-driven anchor scanner fed one chunk at a time.
+
+    Completed anchors queue up as ``(href, text)`` - text joined like
+    BeautifulSoup's ``get_text(" ", strip=True)`` - and ``structured`` is set
+    once the page shows schema.org JobPostings or inline SPA state, which
+    only a full parse (structured_data) can read."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.structured = False
+        self._anchors = []
+        self._href = None
+        self._parts = []
+        self._node = []
+        self._script = None      # text of the inline script being read
+
+    def pop_anchors(self):
+        anchors, self._anchors = self._anchors, []
+        return anchors
+
+    def _flush_node(self):
+        # text nodes may arrive in several pieces across chunk boundaries
+        text = "".join(self._node).strip()
+        self._node = []
+        if text:
+            self._parts.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_node()
+        attrs = dict(attrs)
+        if JOBPOSTING_ITEMTYPE.search(attrs.get("itemtype") or ""):
+            self.structured = True
+        if tag == "a" and attrs.get("href") is not None:
+            self._href, self._parts = attrs["href"], []
+        elif tag == "script":
+            kind = (attrs.get("type") or "").lower()
+            if kind in STRUCTURED_SCRIPT_TYPES or attrs.get("id") in STATE_SCRIPT_IDS:
+                self.structured = True
+            elif kind in ("", "text/javascript", "module"):
+                self._script = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush_node()
+        if tag == "a" and self._href is not None:
+            self._anchors.append((self._href, " ".join(self._parts)))
+            self._href = None
+        elif tag == "script" and self._script is not None:
+            if STATE_GLOBALS.search("".join(self._script)):
+                self.structured = True
+            self._script = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+        elif self._href is not None:
+            self._node.append(data)
+
+    def handle_comment(self, data):
+        self._flush_node()
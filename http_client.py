@@ -0,0 +1,472 @@
+import codecs
+import contextvars
+import math
+import random
+import threading
+import re
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 is optional: pip install "httpx[http2]"
+    httpx = None
+
+import event_log
+from metrics import METRICS
+
+# ================= CONFIG ================= #
+
+DEFAULT_TIMEOUT = 15       # used until a host has enough latency samples
+MIN_TIMEOUT = 3
+LATENCY_WINDOW = 50        # samples kept per host
+LATENCY_MIN_SAMPLES = 5
+TIMEOUT_PERCENTILE = 0.95
+TIMEOUT_MULTIPLIER = 3     # timeout = p95 latency * multiplier, clamped
+
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5         # seconds; doubled per attempt, full jitter
+BACKOFF_CAP = 8
+RETRY_AFTER_CAP = 30       # never sleep longer than this for a Retry-After
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BREAKER_THRESHOLD = 5      # consecutive failures before a host is cut off
+BREAKER_COOLDOWN = 60      # seconds before a half-open probe is allowed
+
+HOST_INTERVAL = 1.0        # minimum seconds between requests to the same host
+# High fan-in ATS hosts serve hundreds of companies each and can take far
+# more than 1 req/s: (interval seconds, concurrent requests), matched on the
+# host or any parent domain. Pipeline stages split such hosts into that many
+# lanes instead of running every company on them through one worker.
+HOST_LIMITS = {
+    "lever.co": (0.1, 8),
+    "greenhouse.io": (0.1, 8),
+    "ashbyhq.com": (0.1, 8),
+    "workable.com": (0.2, 4),
+}
+
+# High fan-in hosts whose requests are multiplexed over a few HTTP/2
+# connections when httpx + h2 are installed; everything else uses requests.
+HTTP2_ENABLED = True
+HTTP2_HOSTS = {
+    "jobs.lever.co", "api.lever.co",
+    "boards.greenhouse.io", "job-boards.greenhouse.io", "boards-api.greenhouse.io",
+    "jobs.ashbyhq.com", "api.ashbyhq.com",
+    "apply.workable.com",
+    "www.linkedin.com", "linkedin.com",
+}
+HTTP2_MAX_CONNECTIONS = 20
+HTTP2_PROTOCOL_ERRORS = 3  # h2 protocol errors before a host is pinned to HTTP/1.1
+TLS_VERIFY = True
+STREAM_CHUNK = 16 * 1024   # bytes per read for get(..., stream=True)
+
+# ================= ADAPTIVE TIMEOUTS ================= #
+
+class HostLatency:
+    """Rolling per-host latency samples used to derive request timeouts."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, host, seconds):
+        with self._lock:
+            self._samples[host].append(seconds)
+
+    def percentile(self, host, q):
+        with self._lock:
+            samples = sorted(self._samples.get(host, ()))
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+    def timeout_for(self, host):
+        p = self.percentile(host, TIMEOUT_PERCENTILE)
+        if p is None:
+            return DEFAULT_TIMEOUT
+        return max(MIN_TIMEOUT, min(DEFAULT_TIMEOUT, p * TIMEOUT_MULTIPLIER))
+
+
+HOST_LATENCY = HostLatency()
+
+# ================= LATENCY BUDGETS ================= #
+
+class Budget:
+    """Wall-clock deadline for one company, with optional per-stage caps."""
+
+    def __init__(self, total, stages=None):
+        self.deadline = time.monotonic() + total
+        self.stages = stages or {}
+        self.stage_name = None
+        self.stage_deadline = math.inf
+        self.hit = set()
+        self.cancelled = False
+        self._left = None
+
+    @property
+    def exhausted(self):
+        return bool(self.hit)
+
+    def pause(self):
+        """Stop the clock, e.g. while the company waits between pipeline stages."""
+        if self._left is None:
+            self._left = self.deadline - time.monotonic()
+
+    def resume(self):
+        if self._left is not None:
+            self.deadline = time.monotonic() + self._left
+            self._left = None
+
+    def cancel(self):
+        """Refuse any further request, e.g. once another source has won."""
+        self.cancelled = True
+
+    def remaining(self):
+        now = time.monotonic()
+        return min(self.deadline, self.stage_deadline) - now
+
+    @contextmanager
+    def stage(self, name):
+        outer = self.stage_name, self.stage_deadline
+        self.stage_name = name
+        self.stage_deadline = time.monotonic() + self.stages.get(name, math.inf)
+        try:
+            yield self
+        finally:
+            self.stage_name, self.stage_deadline = outer
+
+    def timeout(self, wanted):
+        """Clamp ``wanted`` to the time left; None once the budget is spent
+        or cancelled."""
+        if self.cancelled:
+            return None
+        left = self.remaining()
+        if left <= 0:
+            self.hit.add("company" if time.monotonic() >= self.deadline else self.stage_name)
+            return None
+        return min(wanted, left)
+
+
+_current_budget = contextvars.ContextVar("budget", default=None)
+
+@contextmanager
+def company_budget(budget):
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+@contextmanager
+def stage(name):
+    budget = _current_budget.get()
+    if budget is None:
+        yield None
+        return
+    with budget.stage(name):
+        yield budget
+
+# ================= RETRIES ================= #
+
+def retry_after(response):
+    """Seconds requested by a Retry-After header (delta or HTTP date), or None."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff(attempt, response=None):
+    """Delay before retry number ``attempt`` (1-based): Retry-After or full jitter."""
+    hinted = retry_after(response)
+    if hinted is not None:
+        return min(hinted, RETRY_AFTER_CAP)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+# ================= CIRCUIT BREAKERS ================= #
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open single probe."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+_breakers = defaultdict(CircuitBreaker)
+_breakers_lock = threading.Lock()
+
+def breaker(host):
+    with _breakers_lock:
+        return _breakers[host]
+
+# ================= RATE LIMITING ================= #
+
+class RateLimiter:
+    """Spaces calls at least ``interval`` seconds apart across threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def host_limits(host):
+    """(interval, concurrency) for ``host``: its HOST_LIMITS entry, else
+    HOST_INTERVAL with no concurrency cap (None)."""
+    labels = (host or "").lower().split(".")
+    for n in range(len(labels)):
+        limits = HOST_LIMITS.get(".".join(labels[n:]))
+        if limits:
+            return limits
+    return HOST_INTERVAL, None
+
+def host_concurrency(host):
+    """Requests ``host`` may have in flight at once (1 for ordinary hosts)."""
+    return host_limits(host)[1] or 1
+
+
+_limiters = {}
+_slots = {}
+_limiters_lock = threading.Lock()
+
+def host_limiter(host):
+    """Politeness limit shared by every worker thread talking to ``host``."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(host_limits(host)[0])
+        return _limiters[host]
+
+def host_slots(host):
+    """Semaphore capping in-flight requests to a HOST_LIMITS host; a no-op
+    context for every other host."""
+    with _limiters_lock:
+        if host not in _slots:
+            concurrency = host_limits(host)[1]
+            _slots[host] = threading.BoundedSemaphore(concurrency) if concurrency else nullcontext()
+        return _slots[host]
+
+# ================= FETCH ================= #
+
+_local = threading.local()
+
+def _session():
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+_h2 = {"client": None, "failed": False}
+_h2_lock = threading.Lock()
+_h1_only = set()   # hosts whose HTTP/2 stack misbehaved; pinned to HTTP/1.1
+_h2_errors = Counter()
+
+def _h2_client():
+    """Shared, thread-safe HTTP/2 client; None if httpx/h2 are unavailable."""
+    if _h2["client"] is not None or _h2["failed"]:
+        return _h2["client"]
+    with _h2_lock:
+        if _h2["client"] is None and not _h2["failed"]:
+            try:
+                _h2["client"] = httpx.Client(
+                    http2=True, follow_redirects=True, verify=TLS_VERIFY,
+                    limits=httpx.Limits(max_connections=HTTP2_MAX_CONNECTIONS),
+                )
+            except (AttributeError, ImportError):   # httpx missing, or h2 missing
+                _h2["failed"] = True
+    return _h2["client"]
+
+def uses_http2(host):
+    return HTTP2_ENABLED and host in HTTP2_HOSTS and host not in _h1_only and _h2_client() is not None
+
+def _send(url, host, headers, timeout, stream=False):
+    """GET over the shared HTTP/2 client for high fan-in hosts, else requests.
+    httpx errors are re-raised as the equivalent requests exceptions."""
+    for _ in range(2):
+        if not uses_http2(host):
+            break
+        try:
+            client = _h2_client()
+            if stream:
+                r = client.send(client.build_request("GET", url, headers=headers, timeout=timeout), stream=True)
+            else:
+                r = client.get(url, headers=headers, timeout=timeout)
+            _h2_errors.pop(host, None)
+            return r
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except (httpx.RemoteProtocolError, httpx.LocalProtocolError) as e:
+            # a graceful GOAWAY (NO_ERROR) only means "reconnect": resend once
+            # on a fresh connection. Pin the host to HTTP/1.1 only once it
+            # keeps failing for real.
+            if "error_code:0," in str(e) or "NO_ERROR" in str(e):
+                continue
+            _h2_errors[host] += 1
+            if _h2_errors[host] >= HTTP2_PROTOCOL_ERRORS:
+                _h1_only.add(host)
+                METRICS.inc("http2_fallbacks_total")
+            raise requests.ConnectionError(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.RequestException(str(e)) from e
+    return _session().get(url, headers=headers, timeout=timeout, verify=TLS_VERIFY, stream=stream)
+
+def close():
+    with _h2_lock:
+        if _h2["client"] is not None:
+            _h2["client"].close()
+            _h2["client"] = None
+
+def current_stage():
+    budget = _current_budget.get()
+    return (budget.stage_name if budget is not None else None) or "none"
+
+def _attempt(url, host, headers, attempt=1, stream=False):
+    """One request; returns (response, retryable)."""
+    stage_name = current_stage()
+    timeout = HOST_LATENCY.timeout_for(host)
+    budget = _current_budget.get()
+    if budget is not None:
+        timeout = budget.timeout(timeout)
+        if timeout is None:
+            reason = "cancelled" if budget.cancelled else "budget"
+            METRICS.inc("http_skipped_total", stage=stage_name, reason=reason)
+            event_log.emit("request", url=url, stage=stage_name, skipped=reason)
+            return None, False
+
+    start = time.monotonic()
+    try:
+        r = _send(url, host, headers, timeout, stream)
+    except requests.RequestException as e:
+        METRICS.inc("http_requests_total", stage=stage_name, outcome="error")
+        METRICS.inc("http_errors_total", stage=stage_name, error=type(e).__name__)
+        if isinstance(e, requests.Timeout):
+            HOST_LATENCY.record(host, timeout)
+        event_log.emit("request", url=url, stage=stage_name, attempt=attempt, timeout=round(timeout, 2),
+                       latency=round(time.monotonic() - start, 4), error=type(e).__name__)
+        return None, isinstance(e, (requests.Timeout, requests.ConnectionError))
+
+    elapsed = time.monotonic() - start
+    HOST_LATENCY.record(host, elapsed)
+    METRICS.observe("http_request_seconds", elapsed, stage=stage_name)
+    protocol = getattr(r, "http_version", None) or "HTTP/1.1"
+    METRICS.inc("http_requests_total", stage=stage_name, outcome=f"{r.status_code // 100}xx")
+    METRICS.inc("http_protocol_total", protocol=protocol)
+    size = None if stream else len(r.content)   # streamed bytes are counted by iter_text()
+    if size is not None:
+        METRICS.inc("http_response_bytes_total", size, stage=stage_name)
+    if r.status_code >= 400:
+        METRICS.inc("http_errors_total", stage=stage_name, error=f"http_{r.status_code // 100}xx")
+    event_log.emit("request", url=url, stage=stage_name, attempt=attempt, timeout=round(timeout, 2),
+                   status=r.status_code, bytes=size, latency=round(elapsed, 4), protocol=protocol)
+    return r, r.status_code in RETRY_STATUSES
+
+def get(url, headers=None, stream=False):
+    """GET ``url`` with retries, behind the host's circuit breaker and the
+    current budget; returns the last response (possibly >= 400) or None.
+    With ``stream=True`` the body is left unread: consume it with
+    iter_text() and close() the response."""
+    host = urlparse(url).hostname
+    cb = breaker(host)
+    limiter, slots = host_limiter(host), host_slots(host)
+    r = None
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        budget = _current_budget.get()
+        if budget is not None and (budget.cancelled or budget.remaining() <= 0):
+            _attempt(url, host, headers, attempt, stream)   # records the skip; never takes the probe
+            return r
+        if not cb.allow():
+            METRICS.inc("http_skipped_total", stage=current_stage(), reason="circuit_open")
+            event_log.emit("request", url=url, stage=current_stage(), skipped="circuit_open")
+            return r
+        r, retryable = None, True
+        try:
+            with slots:
+                limiter.wait()
+                r, retryable = _attempt(url, host, headers, attempt, stream)
+        finally:
+            # always settle with the breaker, or a half-open probe stays taken
+            if r is not None and not retryable:
+                cb.success()
+            else:
+                cb.failure()
+        if not retryable:
+            return r
+        if attempt == MAX_ATTEMPTS:
+            break
+
+        delay = backoff(attempt, r)
+        budget = _current_budget.get()
+        if budget is not None and delay >= budget.remaining():
+            break
+        METRICS.inc("http_retries_total", stage=current_stage())
+        if stream and r is not None:
+            r.close()
+        time.sleep(delay)
+    return r
+
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+
+def iter_text(r, chunk_size=STREAM_CHUNK):
+    """Decoded body chunks of a ``get(..., stream=True)`` response, counting
+    only the bytes actually read. Stop early by closing ``r``."""
+    stage_name = current_stage()
+    m = _CHARSET.search(r.headers.get("content-type", ""))
+    try:
+        decoder = codecs.getincrementaldecoder(m.group(1) if m else "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = r.iter_bytes(chunk_size) if hasattr(r, "iter_bytes") else r.iter_content(chunk_size)
+    for chunk in chunks:
+        METRICS.inc("http_response_bytes_total", len(chunk), stage=stage_name)
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
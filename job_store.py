@@ -0,0 +1,179 @@
+import sqlite3
+import time
+
+from dedup import canonical_url
+
+# ================= CONFIG ================= #
+
+DB_FILE = "jobs.db"
+CHUNK = 500   # bound variables per IN (...) lookup
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    id           INTEGER PRIMARY KEY,
+    website      TEXT NOT NULL UNIQUE,      -- canonical site URL
+    name         TEXT,
+    careers_url  TEXT,
+    listing_url  TEXT,
+    reason       TEXT,
+    first_seen   REAL NOT NULL,
+    last_checked REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    id         INTEGER PRIMARY KEY,
+    url        TEXT NOT NULL UNIQUE,        -- canonical job URL
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    title      TEXT,
+    location   TEXT,
+    post_date  TEXT,                        -- as published, when the page had one
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL,
+    closed_at  REAL                         -- set once a full check no longer lists it
+);
+CREATE INDEX IF NOT EXISTS postings_company ON postings(company_id, closed_at);
+CREATE INDEX IF NOT EXISTS postings_last_seen ON postings(last_seen);
+CREATE INDEX IF NOT EXISTS companies_last_checked ON companies(last_checked);
+"""
+
+# full-text index over title / location / company, kept in sync by triggers
+# (rowid = postings.id); skipped when SQLite is built without FTS5
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+    title, location, company, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS postings_fts_insert AFTER INSERT ON postings BEGIN
+    INSERT INTO postings_fts (rowid, title, location, company)
+    VALUES (new.id, new.title, new.location, (SELECT name FROM companies WHERE id = new.company_id));
+END;
+CREATE TRIGGER IF NOT EXISTS postings_fts_update AFTER UPDATE OF title, location, company_id ON postings
+WHEN old.title IS NOT new.title OR old.location IS NOT new.location OR old.company_id IS NOT new.company_id BEGIN
+    DELETE FROM postings_fts WHERE rowid = old.id;
+    INSERT INTO postings_fts (rowid, title, location, company)
+    VALUES (new.id, new.title, new.location, (SELECT name FROM companies WHERE id = new.company_id));
+END;
+CREATE TRIGGER IF NOT EXISTS postings_fts_delete AFTER DELETE ON postings BEGIN
+    DELETE FROM postings_fts WHERE rowid = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS companies_fts_rename AFTER UPDATE OF name ON companies
+WHEN old.name IS NOT new.name BEGIN
+    UPDATE postings_fts SET company = new.name
+    WHERE rowid IN (SELECT id FROM postings WHERE company_id = new.id);
+END;
+"""
+
+# ================= STORE ================= #
+
+class JobStore:
+    """SQLite history of companies, their discovery URLs and every posting
+    seen, with first-seen / last-seen / closed timestamps."""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        self.fts = self._create_fts()
+
+    def _create_fts(self):
+        try:
+            with self.db:
+                fresh = not self.db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'postings_fts'").fetchone()
+                self.db.executescript(FTS_SCHEMA)
+                if fresh:   # index postings stored before the index existed
+                    self.db.execute(
+                        """INSERT INTO postings_fts (rowid, title, location, company)
+                           SELECT p.id, p.title, p.location, c.name
+                           FROM postings p JOIN companies c ON c.id = p.company_id""")
+            return True
+        except sqlite3.OperationalError:   # no FTS5 in this SQLite build
+            return False
+
+    def _ids(self, table, column, keys):
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for n in range(0, len(keys), CHUNK):
+            part = keys[n:n + CHUNK]
+            rows = self.db.execute(
+                f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(part))})", part)
+            found.update(rows)
+        return found
+
+    def record(self, companies, now=None):
+        """Upsert one batch in a single transaction.
+
+        ``companies``: dicts with website, name, careers_url, listing_url,
+        reason, jobs (title/url/location/date) and ``complete`` - True when
+        the company's own listing was read in full, so open postings it did
+        not list are marked closed. Returns ({canonical job url: first_seen},
+        {"new": n, "closed": n})."""
+        now = time.time() if now is None else now
+        companies = [c for c in companies if c.get("website")]
+        with self.db:
+            self.db.executemany(
+                """INSERT INTO companies (website, name, careers_url, listing_url, reason, first_seen, last_checked)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(website) DO UPDATE SET
+                       name = excluded.name,
+                       careers_url = COALESCE(excluded.careers_url, companies.careers_url),
+                       listing_url = COALESCE(excluded.listing_url, companies.listing_url),
+                       reason = excluded.reason,
+                       last_checked = excluded.last_checked
+                   WHERE excluded.last_checked >= companies.last_checked""",
+                [(c["website"], c.get("name"), c.get("careers_url"), c.get("listing_url"), c.get("reason"), now, now)
+                 for c in companies])
+            company_ids = self._ids("companies", "website", [c["website"] for c in companies])
+
+            postings = {}
+            for c in companies:
+                for job in c.get("jobs") or []:
+                    postings[canonical_url(job["url"])] = (
+                        company_ids[c["website"]], job.get("title"), job.get("location"), job.get("date"))
+            known = self._ids("postings", "url", postings)
+            self.db.executemany(
+                """INSERT INTO postings (url, company_id, title, location, post_date, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(url) DO UPDATE SET
+                       company_id = excluded.company_id,
+                       title = excluded.title,
+                       location = excluded.location,
+                       post_date = COALESCE(excluded.post_date, postings.post_date),
+                       last_seen = excluded.last_seen,
+                       closed_at = NULL
+                   WHERE excluded.last_seen >= postings.last_seen""",
+                [(url, *fields, now, now) for url, fields in postings.items()])
+            # an older snapshot (e.g. an imported workbook) can only move first_seen back
+            self.db.executemany("UPDATE postings SET first_seen = ? WHERE url = ? AND first_seen > ?",
+                                [(now, url, now) for url in known])
+
+            closed = self.db.executemany(
+                "UPDATE postings SET closed_at = ? WHERE company_id = ? AND closed_at IS NULL AND last_seen < ?",
+                [(now, company_ids[c["website"]], now) for c in companies if c.get("complete")]).rowcount
+
+            first_seen = {}
+            urls = list(postings)
+            for n in range(0, len(urls), CHUNK):
+                part = urls[n:n + CHUNK]
+                first_seen.update(self.db.execute(
+                    f"SELECT url, first_seen FROM postings WHERE url IN ({','.join('?' * len(part))})", part))
+        return first_seen, {"new": len(postings) - len(known), "closed": max(closed, 0)}
+
+    # ---------- QUERIES ---------- #
+
+    def open_postings(self, website):
+        return self.db.execute(
+            """SELECT p.url, p.title, p.location, p.post_date, p.first_seen, p.last_seen
+               FROM postings p JOIN companies c ON c.id = p.company_id
+               WHERE c.website = ? AND p.closed_at IS NULL ORDER BY p.first_seen""",
+            (canonical_url(website),)).fetchall()
+
+    def closed_since(self, since):
+        return self.db.execute(
+            """SELECT c.name, p.url, p.title, p.first_seen, p.closed_at
+               FROM postings p JOIN companies c ON c.id = p.company_id
+               WHERE p.closed_at >= ? ORDER BY p.closed_at""", (since,)).fetchall()
+
+    def close(self):
+        self.db.close()
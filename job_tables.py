@@ -0,0 +1,90 @@
+import math
+import re
+
+from openpyxl import Workbook
+
+# ================= CONFIG ================= #
+#
+# Long-format output: a Companies table (one row per company) and a Postings
+# table (one row per posting, however many were found). The legacy wide
+# Job_List (job post1..N URL/title, Job 1..N Location/Post Date) is a view
+# over them, limited to WIDE_SLOTS postings per company.
+
+WIDE_SLOTS = 3
+COMPANY_COLUMNS = ["Startup", "Website URL", "Careers Page URL", "Job listings page URL",
+                   "Job Status", "Jobs Found", "Reason"]
+POSTING_COLUMNS = ["Startup", "Website URL", "Job URL", "Title", "Location", "Post Date", "Source"]
+JOB_COLUMN = re.compile(r"^(job post\d+ (URL|title)|Job \d+ (Location|Post Date))$")
+
+# ================= TABLES ================= #
+
+def wide_columns(slots=WIDE_SLOTS):
+    return [c for n in range(1, slots + 1)
+            for c in (f"job post{n} URL", f"job post{n} title", f"Job {n} Location", f"Job {n} Post Date")]
+
+def _posting_values(job, default_date):
+    return job["url"], job["title"], job["location"], job["date"] or default_date
+
+def companies(df, results):
+    """(columns, rows) of the Companies table, in ``df`` row order."""
+    own = df.reindex(columns=COMPANY_COLUMNS[:5])
+
+    def rows():
+        for i, values in zip(df.index, own.itertuples(index=False, name=None)):
+            r = results.get(i) or {}
+            yield (*values, len(r.get("jobs") or []), r.get("reason"))
+    return COMPANY_COLUMNS, rows()
+
+def postings(df, results, default_date=None):
+    """(columns, rows) of the Postings table: every job of every company,
+    once (rows sharing another row's crawl are skipped)."""
+    def rows():
+        for i in df.index:
+            if "duplicate_of" in results.get(i, {}):
+                continue
+            jobs = results.get(i, {}).get("jobs") or []
+            name, site = df.at[i, "Startup"], df.at[i, "Website URL"]
+            for job in jobs:
+                yield (name, site, *_posting_values(job, default_date), job.get("source"))
+    return POSTING_COLUMNS, rows()
+
+def wide(df, results, slots=WIDE_SLOTS, default_date=None):
+    """(columns, rows) of the legacy Job_List: ``df``'s own columns plus the
+    first ``slots`` postings spread over fixed columns (job columns already
+    in ``df``, e.g. from a previous output used as input, are replaced)."""
+    df = df[[c for c in df.columns if not JOB_COLUMN.match(str(c))]]
+    columns = list(df.columns) + wide_columns(slots)
+
+    def rows():
+        blank = (None,) * 4
+        for i, values in zip(df.index, df.itertuples(index=False, name=None)):
+            jobs = (results.get(i, {}).get("jobs") or [])[:slots]
+            flat = [v for job in jobs for v in _posting_values(job, default_date)]
+            yield (*values, *flat, *blank * (slots - len(jobs)))
+    return columns, rows()
+
+def frame(df):
+    """(columns, rows) of a DataFrame, for write_workbook."""
+    return list(df.columns), df.itertuples(index=False, name=None)
+
+# ================= WRITER ================= #
+
+def _cell(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def write_workbook(path, sheets):
+    """Stream ``sheets`` ([(name, [(columns, rows), ...]), ...]) into an
+    xlsx with a write-only workbook: rows go straight to disk instead of
+    into per-cell objects. Tables on one sheet are a blank row apart."""
+    wb = Workbook(write_only=True)
+    for name, tables in sheets:
+        ws = wb.create_sheet(name)
+        for n, (columns, rows) in enumerate(tables):
+            if n:
+                ws.append([])
+            ws.append(list(columns))
+            for row in rows:
+                ws.append([_cell(v) for v in row])
+    wb.save(path)
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+from http_client import RateLimiter
+
+# ================= CONFIG ================= #
+
+CACHE_FILE = "linkedin_cache.json"
+CACHE_TTL = 7 * 24 * 3600        # seconds a slug's job list is reused
+EMPTY_TTL = 24 * 3600            # empty results are retried sooner
+REQUEST_INTERVAL = 4.0           # seconds between LinkedIn lookups
+WORKERS = 1
+
+# ================= QUEUE ================= #
+
+class LinkedInQueue:
+    """Rate-limited background queue for LinkedIn lookups with a persistent
+    per-slug cache. ``submit`` never blocks the caller."""
+
+    def __init__(self, lookup, cache_file=CACHE_FILE, ttl=CACHE_TTL,
+                 interval=REQUEST_INTERVAL, workers=WORKERS):
+        self.lookup = lookup
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.limiter = RateLimiter(interval)
+        self.cache = self._load()
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="linkedin")
+
+    def _load(self):
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.cache)
+        tmp = self.cache_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.cache_file)
+
+    def cached(self, slug):
+        with self._lock:
+            entry = self.cache.get(slug)
+        if not entry:
+            return None
+        ttl = self.ttl if entry["jobs"] else min(self.ttl, EMPTY_TTL)
+        if time.time() - entry["ts"] > ttl:
+            return None
+        return entry["jobs"]
+
+    def submit(self, slug, *args):
+        """Queue a lookup for ``slug``; returns a Future of its job list
+        (None if the lookup failed).
+
+        Callers asking for a slug already in flight share its lookup but
+        each get their own Future: cancelling one only drops that caller,
+        and the lookup itself is cancelled once no caller wants it."""
+        jobs = self.cached(slug)
+        if jobs is not None:
+            self.hits += 1
+            done = Future()
+            done.set_result(jobs)
+            return done
+
+        with self._lock:
+            entry = self._inflight.get(slug)
+            if entry is None or entry[0].cancelled():   # a cancelled one never ran
+                self.misses += 1
+                entry = self._inflight[slug] = [self._pool.submit(self._run, slug, args), 0]
+            entry[1] += 1
+            shared = entry[0]
+        mine = Future()
+        mine.add_done_callback(lambda f: f.cancelled() and self._release(slug, shared))
+        shared.add_done_callback(lambda f: _relay(f, mine))
+        return mine
+
+    def _release(self, slug, shared):
+        """One caller of ``shared`` lost interest; cancel it (if it has not
+        started) when it was the last."""
+        with self._lock:
+            entry = self._inflight.get(slug)
+            if entry is None or entry[0] is not shared:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:   # under the lock, so no new caller joins it meanwhile
+                shared.cancel()
+
+    def _run(self, slug, args):
+        try:
+            self.limiter.wait()
+            jobs = self.lookup(*args)
+            if jobs is not None:   # None: the lookup failed, try again next time
+                with self._lock:
+                    self.cache[slug] = {"ts": time.time(), "jobs": jobs}
+            return jobs
+        finally:
+            with self._lock:
+                self._inflight.pop(slug, None)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.save()
+
+
+def _relay(source, target):
+    """Settle ``target`` as ``source`` settled, unless it was cancelled."""
+    try:
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+    except InvalidStateError:   # target cancelled meanwhile
+        pass
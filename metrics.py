@@ -0,0 +1,154 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ================= CONFIG ================= #
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PREFIX = "jobscraper_"
+
+# ================= HISTOGRAM ================= #
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+# ================= REGISTRY ================= #
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms with label sets."""
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def counter(self, name, **match):
+        """Sum of a counter over all label sets that include ``match``."""
+        with self._lock:
+            return sum(v for (n, labels), v in self.counters.items()
+                       if n == name and set(match.items()) <= set(labels))
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc("errors_total", stage=name, error=type(e).__name__)
+            raise
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=name)
+
+    # ---------- EXPORT ---------- #
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())],
+                "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.gauges.items())],
+                "histograms": [
+                    {"name": n, "labels": dict(l), "buckets": list(h.buckets), "counts": list(h.counts),
+                     "sum": h.sum, "count": h.count}
+                    for (n, l), h in sorted(self.histograms.items())
+                ],
+            }
+
+    def prometheus(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+        lines, typed = [], set()
+        with self._lock:
+            for kind, items in (("counter", self.counters), ("gauge", self.gauges)):
+                for (name, labels), value in sorted(items.items()):
+                    if name not in typed:
+                        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                        typed.add(name)
+                    lines.append(f"{PREFIX}{name}{fmt(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}{name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, n in zip(h.buckets + ("+Inf",), h.counts):
+                    cumulative += n
+                    lines.append(f"{PREFIX}{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"{PREFIX}{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path, prom_path):
+        for path, text in ((json_path, json.dumps(self.snapshot(), indent=2)), (prom_path, self.prometheus())):
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+
+    def stage_rows(self):
+        """One summary row per stage, in first-seen order."""
+        with self._lock:
+            stages = [(dict(l)["stage"], h) for (n, l), h in self.histograms.items() if n == "stage_seconds"]
+        rows = []
+        for stage, h in stages:
+            rows.append({
+                "Stage": stage,
+                "Calls": h.count,
+                "Total (s)": round(h.sum, 2),
+                "p50 (s)": h.quantile(0.5),
+                "p95 (s)": h.quantile(0.95),
+                "Requests": self.counter("http_requests_total", stage=stage),
+                "Bytes": self.counter("http_response_bytes_total", stage=stage),
+                "Errors": self.counter("http_errors_total", stage=stage) + self.counter("errors_total", stage=stage),
+            })
+        return rows
+
+
+METRICS = Metrics()
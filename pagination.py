@@ -0,0 +1,90 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# ================= CONFIG ================= #
+
+PAGE_PARAMS = {"page", "p", "pg", "paged", "pagenum", "page_number", "pageno"}
+OFFSET_PARAMS = {"offset", "start", "from", "skip", "startrow"}
+PATH_PAGE = re.compile(r"^(.*?/page/)(\d+)/?$")    # /jobs/page/3
+NEXT_TEXTS = {"next", "next page", "next »", "next ›", "›", "»", ">", "older"}
+
+# ================= DETECTION ================= #
+
+def _split(url):
+    parts = urlsplit(url)
+    return parts, dict(parse_qsl(parts.query, keep_blank_values=True))
+
+def _position(url, base_parts, base_query):
+    """(kind, param, number) when ``url`` is the base listing with only a
+    page/offset number changed, else None."""
+    parts, query = _split(url)
+    if (parts.scheme, parts.netloc) != (base_parts.scheme, base_parts.netloc):
+        return None
+    if parts.path.rstrip("/") != base_parts.path.rstrip("/"):
+        m, base = PATH_PAGE.match(parts.path), PATH_PAGE.match(base_parts.path)
+        stem = base.group(1) if base else base_parts.path.rstrip("/") + "/page/"
+        if m and m.group(1) == stem and query == base_query:
+            return "path", None, int(m.group(2))
+        return None
+    changed = [k for k in query.keys() | base_query.keys() if query.get(k) != base_query.get(k)]
+    if len(changed) != 1 or not query.get(changed[0], "").isdigit():
+        return None
+    param = changed[0]
+    if param.lower() in PAGE_PARAMS:
+        return "page", param, int(query[param])
+    if param.lower() in OFFSET_PARAMS:
+        return "offset", param, int(query[param])
+    return None
+
+def _current(kind, param, parts, query):
+    if kind == "path":
+        m = PATH_PAGE.match(parts.path)
+        return int(m.group(2)) if m else 1
+    value = query.get(param, "")
+    return int(value) if value.isdigit() else (1 if kind == "page" else 0)
+
+def _build(kind, param, number, parts, query):
+    if kind == "path":
+        m = PATH_PAGE.match(parts.path)
+        stem = m.group(1) if m else parts.path.rstrip("/") + "/page/"
+        return urlunsplit(parts._replace(path=f"{stem}{number}"))
+    return urlunsplit(parts._replace(query=urlencode({**query, param: number})))
+
+def page_urls(soup, url, limit):
+    """URLs of a listing's further pages, in order, when its links show the
+    pattern: numbered page links (?page=N, /page/N) or offsets (?start=N).
+    Pages between the ones linked are filled in, up to ``limit`` URLs."""
+    parts, query = _split(url)
+    found = {}
+    for a in soup.find_all(["a", "link"], href=True):
+        position = _position(urljoin(url, a["href"]), parts, query)
+        if position:
+            kind, param, number = position
+            found.setdefault((kind, param), set()).add(number)
+    if not found:
+        return []
+
+    (kind, param), numbers = max(found.items(), key=lambda kv: len(kv[1]))
+    current = _current(kind, param, parts, query)
+    numbers = sorted(n for n in numbers if n > current)
+    if not numbers:
+        return []
+    if kind == "offset":
+        steps = [b - a for a, b in zip([current] + numbers, numbers)]
+        step = min(s for s in steps if s > 0)
+    else:
+        step = 1
+    return [_build(kind, param, n, parts, query)
+            for n in range(current + step, numbers[-1] + 1, step)][:limit]
+
+def next_page(soup, url):
+    """A listing's "next page" link (rel=next or Next/› text), or None."""
+    for tag in soup.find_all(["link", "a"], href=True):
+        rel = tag.get("rel") or []
+        if "next" in [r.lower() for r in rel]:
+            return urljoin(url, tag["href"])
+    for a in soup.find_all("a", href=True):
+        label = (a.get_text(" ", strip=True) or a.get("aria-label") or "").lower()
+        if label in NEXT_TEXTS or (a.get("aria-label") or "").lower() in ("next", "next page"):
+            return urljoin(url, a["href"])
+    return None
@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+
+from metrics import METRICS
+
+# ================= CONFIG ================= #
+
+QUEUE_SIZE = 16   # items buffered in front of each stage (per worker for keyed stages)
+
+_DONE = object()
+
+# ================= STAGES ================= #
+
+class Stage:
+    """One pipeline step: ``fn(item) -> item`` run by ``workers`` threads.
+
+    With ``key`` every worker owns its queue and items are routed by
+    ``hash(key(item))``, so items sharing a key (e.g. a host) run in order
+    on one thread and reuse its connection."""
+
+    def __init__(self, name, fn, workers=1, key=None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.key = key
+
+
+class Pipeline:
+    """Stages connected by bounded queues. A full queue blocks whoever feeds
+    it, so a slow stage throttles everything upstream instead of letting
+    items (and the pages they carry) pile up in memory."""
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def run(self, items, stop=None):
+        """Feed ``items`` through every stage; yields items as they leave the
+        last one. Feeding ends early once ``stop()`` is true and items already
+        inside are drained. An item whose stage raised skips the remaining
+        stages with ``item["error"]`` set."""
+        queues = [[queue.Queue(self.queue_size) for _ in range(s.workers if s.key else 1)]
+                  for s in self.stages]
+        out = queue.Queue(self.queue_size)
+        alive = [s.workers for s in self.stages]
+        lock = threading.Lock()
+
+        def put(level, item, name):
+            if level == len(self.stages):
+                q = out
+            else:
+                s, qs = self.stages[level], queues[level]
+                q = qs[hash(s.key(item)) % len(qs)] if s.key else qs[0]
+            start = time.perf_counter()
+            q.put(item)
+            METRICS.inc("pipeline_blocked_seconds_total", time.perf_counter() - start, stage=name)
+
+        def close(level):
+            if level == len(self.stages):
+                out.put(_DONE)
+                return
+            qs = queues[level]
+            for q in qs if self.stages[level].key else qs * self.stages[level].workers:
+                q.put(_DONE)
+
+        def work(level, q):
+            s = self.stages[level]
+            while True:
+                item = q.get()
+                if item is _DONE:
+                    break
+                try:
+                    item, nxt = s.fn(item), level + 1
+                except Exception as e:
+                    METRICS.inc("pipeline_errors_total", stage=s.name, error=type(e).__name__)
+                    item["error"] = f"{s.name}: {type(e).__name__}: {e}"
+                    nxt = len(self.stages)
+                METRICS.inc("pipeline_items_total", stage=s.name)
+                put(nxt, item, s.name)
+            with lock:
+                alive[level] -= 1
+                last = alive[level] == 0
+            if last:
+                close(level + 1)
+
+        def feed():
+            for item in items:
+                if stop is not None and stop():
+                    break
+                put(0, item, "feed")
+            close(0)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for level, s in enumerate(self.stages):
+            for n in range(s.workers):
+                q = queues[level][n] if s.key else queues[level][0]
+                threads.append(threading.Thread(target=work, args=(level, q), name=f"{s.name}-{n}", daemon=True))
+        for t in threads:
+            t.start()
+
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            yield item
+        for t in threads:
+            t.join()
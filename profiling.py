@@ -0,0 +1,165 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# ================= CONFIG ================= #
+
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+TOP_N = 20
+TRACEMALLOC_FRAMES = 10
+# Before 3.12 a cProfile.Profile sees only the thread that enabled it, so
+# every new thread starts its own. From 3.12 it runs on sys.monitoring: one
+# Profile covers every thread and a second one cannot be enabled.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+_active = None
+
+# ================= PROFILER ================= #
+
+class Profiler:
+    """cProfile (every thread) + tracemalloc + a stack sampler whose samples
+    are tagged with the company and stage each thread is working on."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, top_n=TOP_N):
+        self.interval = interval
+        self.top_n = top_n
+        self.profiles = []
+        self.samples = Counter()
+        self.labels = {}                       # thread id -> [company, stage]
+        self.stats = defaultdict(lambda: {"wall": 0.0, "cpu": 0.0, "alloc": 0, "calls": 0})
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+
+    # ---------- LIFECYCLE ---------- #
+
+    def _thread_profile(self, *_):
+        sys.setprofile(None)   # this thread only; threading's hook stays for the next ones
+        p = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(p)
+        p.enable()
+
+    def start(self):
+        global _active
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._sampler.start()
+        main = cProfile.Profile()
+        self.profiles.append(main)
+        if PER_THREAD_PROFILES:
+            threading.setprofile(self._thread_profile)   # new threads profile themselves
+        main.enable()
+        _active = self
+
+    def stop(self):
+        global _active
+        _active = None
+        self._stop.set()
+        self._sampler.join()
+        threading.setprofile(None)
+        for p in self.profiles:
+            p.disable()
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    # ---------- ATTRIBUTION ---------- #
+
+    @contextmanager
+    def attribute(self, company=None, stage=None):
+        tid = threading.get_ident()
+        outer = self.labels.get(tid)
+        label = [company or (outer[0] if outer else "-"), stage or (outer[1] if outer else "-")]
+        self.labels[tid] = label
+        wall, cpu = time.perf_counter(), time.thread_time()
+        mem = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            key = ("company", label[0]) if stage is None else ("stage", label[1])
+            with self._lock:
+                s = self.stats[key]
+                s["wall"] += time.perf_counter() - wall
+                s["cpu"] += time.thread_time() - cpu
+                s["alloc"] += tracemalloc.get_traced_memory()[0] - mem
+                s["calls"] += 1
+            if outer is None:
+                self.labels.pop(tid, None)
+            else:
+                self.labels[tid] = outer
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid, label in list(self.labels.items()):
+                frame = frames.get(tid)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                self.samples[";".join(label + stack[::-1])] += 1
+
+    # ---------- REPORT ---------- #
+
+    def write_report(self, report_path, collapsed_path):
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        out = io.StringIO()
+        for kind, title in (("company", f"Top {self.top_n} slowest companies"), ("stage", "Stages")):
+            rows = sorted(((k[1], v) for k, v in self.stats.items() if k[0] == kind),
+                          key=lambda kv: kv[1]["wall"], reverse=True)
+            if kind == "company":
+                rows = rows[:self.top_n]
+            out.write(f"== {title} ==\n")
+            out.write(f"{'name':<50} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'alloc KiB':>10}\n")
+            for name, v in rows:
+                out.write(f"{name[:50]:<50} {v['calls']:>6} {v['wall']:>9.2f} {v['cpu']:>9.2f} {v['alloc'] / 1024:>10.1f}\n")
+            out.write("\n")
+
+        out.write(f"== Top {self.top_n} functions by cumulative time (all threads) ==\n")
+        stats = pstats.Stats(self.profiles[0], stream=out)
+        for p in self.profiles[1:]:
+            try:
+                stats.add(p)
+            except TypeError:      # thread never ran any profiled code
+                pass
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+
+        out.write(f"== Top {self.top_n} allocation sites ==\n")
+        for stat in self.snapshot.statistics("lineno")[:self.top_n]:
+            out.write(f"{stat}\n")
+
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+
+# ================= HOOKS ================= #
+
+@contextmanager
+def attribute(company=None, stage=None):
+    """Attribute CPU, wall time and allocations to a company or stage;
+    a no-op unless a profiler is running."""
+    prof = _active
+    if prof is None:
+        yield
+        return
+    with prof.attribute(company, stage):
+        yield
+
+@contextmanager
+def profile(report_path, collapsed_path, top_n=TOP_N):
+    prof = Profiler(top_n=top_n)
+    prof.start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+        prof.write_report(report_path, collapsed_path)
@@ -0,0 +1,188 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # optional: pip install python-calamine (~10x faster xlsx reads)
+    CalamineWorkbook = None
+
+from dedup import canonical_url
+
+# ================= CONFIG ================= #
+#
+# What changed between two runs' workbooks:
+#
+#   python run_diff.py Output_File_120.xlsx Output_File_120_new.xlsx
+#   python run_diff.py OLD.xlsx NEW.xlsx --output changes.xlsx
+#
+# Postings are matched on canonical job URL, companies on website domain.
+
+SHEET = "Job_List"   # falls back to the first sheet (older outputs use Sheet1)
+LONG_SHEETS = ("Companies", "Postings")   # --format long outputs: preferred over Job_List
+DIFF_SHEET = "Diff"
+JOB_URL = re.compile(r"^job post(\d+) URL$")
+DOMAIN = re.compile(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?([^/?#\s]+?)(?::(?:80|443))?(?:[/?#]|$)")
+UNCHECKED = ("Not Attempted", "Invalid Website")   # a missing posting there is not a closure
+
+DIFF_COLUMNS = ["Change", "Startup", "Domain", "Job URL", "Title", "Location", "Before", "After"]
+CHANGE_ORDER = {"New Posting": 0, "Closed Posting": 1, "Changed Posting": 2, "Not Checked": 3,
+                "Status Change": 4, "New Company": 5, "Dropped Company": 6}
+
+# ================= INDEX ================= #
+
+def company_domain(site):
+    """Host of a website cell as canonical_url() would give it (no www,
+    no default port), without a full URL parse per row."""
+    if not isinstance(site, str):
+        return None
+    m = DOMAIN.match(site.strip().lower())
+    return m.group(1) if m else None
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ""
+
+def index_rows(columns, rows):
+    """Hash indexes over one run's Job_List rows: ({domain: company},
+    {canonical job url: posting}). ``rows`` are value tuples in
+    ``columns`` order; one pass, no row objects. Rows of a long-format
+    Postings table (one "Job URL" per row) work too."""
+    pos = {name: n for n, name in enumerate(columns)}
+    if "Job URL" in pos:
+        slots = [(pos["Job URL"], pos.get("Title"), pos.get("Location"))]
+    else:
+        slots = sorted((int(m.group(1)), n) for n, name in enumerate(columns)
+                       if isinstance(name, str) and (m := JOB_URL.match(name)))
+        slots = [(n, pos.get(f"job post{k} title"), pos.get(f"Job {k} Location")) for k, n in slots]
+    site_col, name_col, status_col = pos.get("Website URL"), pos.get("Startup"), pos.get("Job Status")
+
+    companies, postings = {}, {}
+    for row in rows:
+        domain = company_domain(row[site_col]) if site_col is not None else None
+        if not domain:
+            continue
+        companies[domain] = {
+            "name": _text(row[name_col]) if name_col is not None else "",
+            "status": _text(row[status_col]) if status_col is not None else "",
+        }
+        for url_col, title_col, location_col in slots:
+            url = canonical_url(row[url_col])
+            if url:
+                postings[url] = {
+                    "domain": domain,
+                    "url": row[url_col].strip(),
+                    "title": _text(row[title_col]) if title_col is not None else "",
+                    "location": _text(row[location_col]) if location_col is not None else "",
+                }
+    return companies, postings
+
+def index_long(companies, postings):
+    """index_rows() over a long-format run: (columns, rows) of its
+    Companies and Postings tables."""
+    return index_rows(*companies)[0], index_rows(*postings)[1]
+
+def _table(rows):
+    rows = iter(rows)
+    return list(next(rows, ())), rows
+
+def load_run(path):
+    """Index a workbook's Companies + Postings tables, else its Job_List,
+    streaming rows instead of building a DataFrame (calamine when
+    installed, else read-only openpyxl)."""
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(path)
+        sheet = lambda name: _table(wb.get_sheet_by_name(name).to_python())
+        names = wb.sheet_names
+    else:
+        wb = load_workbook(path, read_only=True, data_only=True)
+        sheet = lambda name: _table(wb[name].iter_rows(values_only=True))
+        names = wb.sheetnames
+    try:
+        if all(name in names for name in LONG_SHEETS):
+            return index_long(*map(sheet, LONG_SHEETS))
+        return index_rows(*sheet(SHEET if SHEET in names else names[0]))
+    finally:
+        if CalamineWorkbook is None:
+            wb.close()
+
+# ================= DIFF ================= #
+
+def diff_runs(old, new):
+    """Added / removed / changed postings and company status changes
+    between two ``index_rows`` results, as Diff sheet rows."""
+    old_companies, old_postings = old
+    new_companies, new_postings = new
+
+    def row(change, domain, posting=None, before="", after=""):
+        company = new_companies.get(domain) or old_companies.get(domain) or {}
+        return {
+            "Change": change, "Startup": company.get("name", ""), "Domain": domain,
+            "Job URL": posting["url"] if posting else "", "Title": posting["title"] if posting else "",
+            "Location": posting["location"] if posting else "", "Before": before, "After": after,
+        }
+
+    rows = []
+    for url in new_postings.keys() - old_postings.keys():
+        rows.append(row("New Posting", new_postings[url]["domain"], new_postings[url]))
+    for url in old_postings.keys() - new_postings.keys():
+        posting = old_postings[url]
+        status = new_companies.get(posting["domain"], {}).get("status")
+        change = "Not Checked" if status is None or status in UNCHECKED else "Closed Posting"
+        rows.append(row(change, posting["domain"], posting))
+    for url in new_postings.keys() & old_postings.keys():
+        a, b = old_postings[url], new_postings[url]
+        if (a["title"], a["location"]) != (b["title"], b["location"]):
+            rows.append(row("Changed Posting", b["domain"], b,
+                            f"{a['title']} | {a['location']}", f"{b['title']} | {b['location']}"))
+
+    for domain in new_companies.keys() - old_companies.keys():
+        rows.append(row("New Company", domain, after=new_companies[domain]["status"]))
+    for domain in old_companies.keys() - new_companies.keys():
+        rows.append(row("Dropped Company", domain, before=old_companies[domain]["status"]))
+    for domain in new_companies.keys() & old_companies.keys():
+        before, after = old_companies[domain]["status"], new_companies[domain]["status"]
+        if before != after:
+            rows.append(row("Status Change", domain, before=before, after=after))
+
+    rows.sort(key=lambda r: (CHANGE_ORDER[r["Change"]], r["Domain"], r["Job URL"]))
+    return pd.DataFrame(rows, columns=DIFF_COLUMNS)
+
+def summary(diff):
+    counts = diff["Change"].value_counts()
+    return ", ".join(f"{c}: {counts.get(c, 0)}" for c in CHANGE_ORDER)
+
+# ================= MAIN ================= #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two runs' output workbooks")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--output", help=f"write the {DIFF_SHEET} sheet here instead of into NEW")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(2) as pool:   # parsing is CPU-bound: one process per workbook
+            old, new = pool.map(load_run, [args.old, args.new])
+    else:
+        old, new = load_run(args.old), load_run(args.new)
+    loaded = time.perf_counter()
+    diff = diff_runs(old, new)
+    print(f"📖 {len(old[1])} / {len(new[1])} postings indexed in {loaded - start:.1f}s, "
+          f"diffed in {time.perf_counter() - loaded:.2f}s")
+
+    if args.output:
+        writer = pd.ExcelWriter(args.output, engine="openpyxl")
+    else:
+        writer = pd.ExcelWriter(args.new, engine="openpyxl", mode="a", if_sheet_exists="replace")
+    with writer:
+        diff.to_excel(writer, index=False, sheet_name=DIFF_SHEET)
+    print(f"✅ {DIFF_SHEET} sheet written to {args.output or args.new}: {summary(diff)}")
+
+if __name__ == "__main__":
+    main()
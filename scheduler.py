@@ -0,0 +1,40 @@
+from collections import deque
+
+# ================= CONFIG ================= #
+
+BATCH_SIZE = 5   # companies per host handed to one worker (connection reuse)
+
+# ================= HOST AFFINITY ================= #
+
+def host_batches(items, batch_size=BATCH_SIZE, scores=None):
+    """Group ``(key, host)`` pairs into per-host batches and order the
+    batches round-robin across hosts, busiest host first.
+
+    A worker runs a whole batch on one thread, so its keep-alive connection
+    to that host is reused; consecutive batches target different hosts, so
+    concurrent workers keep every per-host rate limit busy instead of
+    queueing behind one of them.
+
+    With ``scores`` (key -> expected yield) each host's keys are batched
+    best first and batches are ordered by their best key; the round-robin
+    order only breaks ties."""
+    groups = {}
+    for key, host in items:
+        groups.setdefault(host or "", []).append(key)
+    if scores is not None:
+        for keys in groups.values():
+            keys.sort(key=lambda k: -scores[k])
+
+    queues = deque(
+        deque(keys[i:i + batch_size] for i in range(0, len(keys), batch_size))
+        for keys in sorted(groups.values(), key=len, reverse=True)
+    )
+    batches = []
+    while queues:
+        chunks = queues.popleft()
+        batches.append(chunks.popleft())
+        if chunks:
+            queues.append(chunks)
+    if scores is not None:
+        batches.sort(key=lambda batch: -scores[batch[0]])
+    return batches
@@ -0,0 +1,209 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import job_store
+
+# ================= CONFIG ================= #
+#
+# Full-text search over the job store (jobs.db):
+#
+#   python search.py --title data --location "remote|bengaluru"
+#   python search.py --title "backend*" --sort relevance
+#   python search.py "data AND (remote OR bengaluru)"      # raw FTS5 query
+#   python search.py --import "Output_*.xlsx"               # index old workbooks
+#   python search.py --serve 8080   ->  GET /search?title=data&location=pune
+
+SHEET = "Job_List"   # falls back to the first sheet (older outputs use Sheet1)
+# (URL, title) column names of job slot {n} in the output layouts seen so far
+JOB_SLOTS = [("job post{n} URL", "job post{n} title"),
+             ("Job {n} Post URL", "Job {n} Post Title"),
+             ("Job {n} URL", "Job {n} Title")]
+LISTING_COLUMNS = ("Job listings page URL", "Job Listings Page URL")
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+FIELDS = ("title", "location", "company")
+SORTS = {
+    "newest": "f.rowid DESC",   # walks the index in order and stops at LIMIT: ~1 ms
+    "relevance": "f.rank",      # bm25 over every match: slower on broad queries
+}
+
+# ================= QUERY ================= #
+
+def _field_match(column, value):
+    alternatives = []
+    for alternative in re.split(r"[|,]", value):
+        words = re.findall(r"\w+\*?", alternative)
+        if words:
+            alternatives.append(" ".join(f'"{w[:-1]}"*' if w.endswith("*") else f'"{w}"' for w in words))
+    if not alternatives:
+        return None
+    return f"{column} : (" + " OR ".join(f"({a})" for a in alternatives) + ")"
+
+def match_expression(query=None, **fields):
+    """FTS5 MATCH string: ``query`` as raw FTS5 syntax, AND-ed with one
+    clause per field. Within a field all words must match, '|' or ','
+    separates alternatives (location="remote|bengaluru") and a trailing
+    '*' makes a word a prefix."""
+    parts = [f"({query})"] if query and query.strip() else []
+    for column in FIELDS:
+        clause = _field_match(column, fields.get(column) or "")
+        if clause:
+            parts.append(clause)
+    return " AND ".join(parts)
+
+def search(db, query=None, open_only=True, limit=DEFAULT_LIMIT, sort="newest", **fields):
+    """Matching postings as dicts, most recently first seen (or best bm25) first."""
+    expression = match_expression(query, **fields)
+    if not expression:
+        return []
+    sql = """SELECT p.title, p.location, c.name AS company, p.url, p.post_date,
+                    p.first_seen, p.last_seen, p.closed_at
+             FROM postings_fts f
+             JOIN postings p ON p.id = f.rowid
+             JOIN companies c ON c.id = p.company_id
+             WHERE postings_fts MATCH ?"""
+    if open_only:
+        sql += " AND p.closed_at IS NULL"
+    sql += f" ORDER BY {SORTS[sort]} LIMIT ?"
+    cursor = db.execute(sql, (expression, max(1, min(limit, MAX_LIMIT))))
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+def connect(path):
+    """Read-only connection for queries (one per thread)."""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+# ================= IMPORT ================= #
+
+def import_workbook(store, path):
+    """Load a wide Output_*.xlsx Job_List (else its first sheet) into the
+    store, dated by the file's modification time. Never marks postings
+    closed."""
+    with pd.ExcelFile(path) as book:
+        df = book.parse(SHEET if SHEET in book.sheet_names else book.sheet_names[0])
+    slots = [(url.format(n=n), title.format(n=n), n)
+             for url, title in JOB_SLOTS for n in range(1, 100) if url.format(n=n) in df.columns]
+    if not slots:
+        raise ValueError("no job columns (job post1 URL, Job 1 Post URL, ...)")
+    listing_column = next((c for c in LISTING_COLUMNS if c in df.columns), None)
+    companies = []
+    for _, row in df.iterrows():
+        site = row.get("Website URL")
+        if not isinstance(site, str) or not site.strip():
+            continue
+        jobs = {}
+        for url_column, title_column, n in slots:
+            url = row.get(url_column)
+            if isinstance(url, str) and url.strip():
+                jobs.setdefault(url.strip(), {"url": url.strip(), "title": row.get(title_column),
+                                              "location": row.get(f"Job {n} Location"),
+                                              "date": row.get(f"Job {n} Post Date")})
+        listing = row.get(listing_column) if listing_column else None
+        companies.append({
+            "website": job_store.canonical_url(site if site.startswith("http") else "https://" + site.strip()),
+            "name": str(row.get("Startup")),
+            "careers_url": row.get("Careers Page URL") if isinstance(row.get("Careers Page URL"), str) else None,
+            "listing_url": listing if isinstance(listing, str) else None,
+            "reason": f"imported from {os.path.basename(path)}",
+            "jobs": [{k: (v if isinstance(v, str) else None) for k, v in j.items()} for j in jobs.values()],
+        })
+    _, changes = store.record(companies, now=os.path.getmtime(path))
+    return len(companies), changes["new"]
+
+# ================= HTTP ================= #
+
+def serve(path, port):
+    local = threading.local()   # one read-only connection per handler thread
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/search":
+                self.send_error(404)
+                return
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            start = time.perf_counter()
+            try:
+                if not hasattr(local, "db"):
+                    local.db = connect(path)
+                db = local.db
+                rows = search(db, params.get("q"), open_only=params.get("open", "1") != "0",
+                              limit=int(params.get("limit", DEFAULT_LIMIT)),
+                              sort=params.get("sort", "newest"),
+                              **{f: params.get(f) for f in FIELDS})
+                body = {"results": rows, "count": len(rows), "ms": round((time.perf_counter() - start) * 1000, 2)}
+                status = 200
+            except (sqlite3.OperationalError, ValueError, KeyError) as e:
+                body, status = {"error": str(e)}, 400
+            data = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"🔎 http://127.0.0.1:{port}/search?title=data&location=bengaluru")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+# ================= MAIN ================= #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over scraped postings")
+    parser.add_argument("query", nargs="?", help="raw FTS5 query, e.g. 'data AND remote'")
+    for field in FIELDS:
+        parser.add_argument(f"--{field}", help=f"words that must all be in {field}; '|' separates alternatives")
+    parser.add_argument("--db", default=job_store.DB_FILE)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--sort", choices=SORTS, default="newest")
+    parser.add_argument("--all", action="store_true", help="include closed postings")
+    parser.add_argument("--import", dest="workbooks", metavar="GLOB", help="index Output_*.xlsx workbooks first")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="serve GET /search on localhost")
+    args = parser.parse_args(argv)
+
+    store = job_store.JobStore(args.db)   # creates the schema / index if needed
+    if not store.fts:
+        parser.error("this SQLite build has no FTS5")
+    if args.workbooks:
+        for path in sorted(glob.glob(args.workbooks)):
+            try:
+                companies, new = import_workbook(store, path)
+            except Exception as e:   # one unreadable workbook must not stop the rest
+                print(f"⚠️ {path}: skipped ({type(e).__name__}: {e})")
+                continue
+            print(f"📥 {path}: {companies} companies, {new} new postings")
+    store.close()
+
+    if args.serve:
+        serve(args.db, args.serve)
+        return
+
+    start = time.perf_counter()
+    try:
+        rows = search(connect(args.db), args.query, open_only=not args.all, limit=args.limit, sort=args.sort,
+                      **{f: getattr(args, f) for f in FIELDS})
+    except sqlite3.OperationalError as e:   # malformed raw FTS5 query
+        parser.error(f"bad query: {e}")
+    elapsed = (time.perf_counter() - start) * 1000
+    for r in rows:
+        print(f"{r['title'] or '':<45.45} {r['location'] or '':<20.20} {r['company'] or '':<25.25} {r['url']}")
+    print(f"{len(rows)} result(s) in {elapsed:.1f} ms")
+
+if __name__ == "__main__":
+    main()
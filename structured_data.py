@@ -0,0 +1,295 @@
+import json
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+# ================= HELPERS ================= #
+
+DATE_FORMAT = "%B %Y"   # same month-year format as job_date()
+
+def format_date(value):
+    """schema.org date/datetime -> 'December 2025'; None if unparseable."""
+    if not isinstance(value, str):
+        return None
+    m = re.match(r"\s*(\d{4})-(\d{1,2})(?:-(\d{1,2}))?", value)
+    if not m:
+        return None
+    try:
+        return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3) or 1)).strftime(DATE_FORMAT)
+    except ValueError:
+        return None
+
+def _types(node):
+    t = node.get("@type", [])
+    return t if isinstance(t, list) else [t]
+
+def _text(value):
+    if isinstance(value, str):
+        return " ".join(value.split()) or None
+    if isinstance(value, dict):
+        return _text(value.get("name") or value.get("@value"))
+    return None
+
+def _location(posting):
+    if str(posting.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+        return "Remote"
+    places = posting.get("jobLocation") or []
+    if isinstance(places, dict):
+        places = [places]
+    for place in places:
+        if not isinstance(place, dict):
+            continue
+        address = place.get("address", place)
+        if isinstance(address, str):
+            return _text(address)
+        if isinstance(address, dict):
+            parts = [_text(address.get(k)) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [p for p in parts if p]
+            if parts:
+                return ", ".join(dict.fromkeys(parts))
+        name = _text(place.get("name"))
+        if name:
+            return name
+    return None
+
+# ================= JSON-LD ================= #
+
+def _walk(node):
+    """Yield every dict in a JSON-LD document (@graph, ItemList, nesting)."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "itemListElement", "item", "mainEntity"):
+            if key in node:
+                yield from _walk(node[key])
+
+def _jsonld_postings(soup, base_url):
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text() or "")
+        except ValueError:
+            continue
+        for node in _walk(data):
+            if "JobPosting" not in _types(node):
+                continue
+            url = node.get("url") or node.get("sameAs")
+            yield {
+                "title": _text(node.get("title") or node.get("name")),
+                "url": urljoin(base_url, url) if isinstance(url, str) else None,
+                "location": _location(node),
+                "date": format_date(node.get("datePosted")),
+            }
+
+# ================= MICRODATA ================= #
+
+def _prop(scope, name):
+    el = scope.find(attrs={"itemprop": name})
+    if el is None:
+        return None
+    for attr in ("content", "datetime", "href"):
+        if el.get(attr):
+            return el[attr]
+    return el.get_text(" ", strip=True) or None
+
+def _microdata_postings(soup, base_url):
+    for scope in soup.find_all(attrs={"itemtype": re.compile(r"schema\.org/JobPosting", re.I)}):
+        url = _prop(scope, "url")
+        location = None
+        place = scope.find(attrs={"itemprop": "jobLocation"})
+        if place is not None:
+            parts = [_prop(place, k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            location = ", ".join(dict.fromkeys(p for p in parts if p)) or place.get_text(" ", strip=True) or None
+        yield {
+            "title": _text(_prop(scope, "title")),
+            "url": urljoin(base_url, url) if url else None,
+            "location": location,
+            "date": format_date(_prop(scope, "datePosted")),
+        }
+
+# ================= PUBLIC ================= #
+
+def job_postings(soup, base_url):
+    """All schema.org JobPostings on a page, JSON-LD first, then microdata.
+    Missing fields are None."""
+    return list(_jsonld_postings(soup, base_url)) + list(_microdata_postings(soup, base_url))
+
+# ================= EMBEDDED SPA STATE ================= #
+
+TITLE_KEYS = ("title", "jobTitle", "text", "positionName", "position", "name")
+URL_KEYS = ("absolute_url", "hostedUrl", "jobUrl", "applyUrl", "applicationUrl", "url",
+            "canonicalUrl", "shortlink", "externalPath", "path")
+ID_KEYS = ("slug", "shortcode", "id", "jobId", "reqId")
+LOCATION_KEYS = ("location", "locationName", "jobLocation", "city", "office", "country")
+DATE_KEYS = ("datePosted", "publishedAt", "published_on", "publishedDate", "postedOn",
+             "postedDate", "createdAt", "created_at", "updated_at", "updatedAt")
+JOB_HINTS = ("job", "posting", "opening", "position", "vacanc", "role", "requisition", "career")
+STATE_GLOBALS = re.compile(r"window\.(__[A-Z0-9_]+__|[A-Za-z_$][\w$]*State)\s*=\s*")
+MAX_DEPTH = 12
+
+def _devalue(payload):
+    """Resolve a Nuxt 3 / devalue payload (flat array of index references)."""
+    memo = {}
+
+    def resolve(i, depth=0):
+        if not isinstance(i, int) or i < 0 or i >= len(payload) or depth > MAX_DEPTH * 2:
+            return None
+        if i in memo:
+            return memo[i]
+        v = payload[i]
+        if isinstance(v, list):
+            if v and isinstance(v[0], str) and v[0] in ("Reactive", "ShallowReactive", "Ref", "ShallowRef"):
+                out = resolve(v[1], depth + 1) if len(v) > 1 else None
+            elif v and isinstance(v[0], str) and v[0] == "Date":
+                out = v[1] if len(v) > 1 else None
+            else:
+                out = [resolve(x, depth + 1) for x in v]
+        elif isinstance(v, dict):
+            out = {k: resolve(x, depth + 1) for k, x in v.items()}
+        else:
+            out = v
+        memo[i] = out
+        return out
+
+    return resolve(0)
+
+def _state_payloads(soup):
+    """JSON documents a client-rendered page ships inline."""
+    for script in soup.find_all("script"):
+        text = script.string or ""
+        if not text.strip():
+            continue
+        kind = (script.get("type") or "").lower()
+        if kind == "application/json" or script.get("id") in ("__NEXT_DATA__", "__NUXT_DATA__"):
+            try:
+                data = json.loads(text)
+            except ValueError:
+                continue
+            if script.get("id") == "__NUXT_DATA__" and isinstance(data, list):
+                data = _devalue(data)
+            yield data
+        elif kind in ("", "text/javascript", "module"):
+            for m in STATE_GLOBALS.finditer(text):
+                rest = text[m.end():].lstrip()
+                try:
+                    if rest.startswith("JSON.parse("):
+                        literal, _ = json.JSONDecoder().raw_decode(rest[len("JSON.parse("):])
+                        yield json.loads(literal)
+                    else:
+                        yield json.JSONDecoder().raw_decode(rest)[0]
+                except ValueError:
+                    continue
+
+def _first(node, keys):
+    for k in keys:
+        v = node.get(k)
+        if v not in (None, "", [], {}):
+            return v
+    return None
+
+def _jobish(item):
+    return isinstance(item, dict) and isinstance(_first(item, TITLE_KEYS), str) \
+        and _first(item, URL_KEYS + ID_KEYS) is not None
+
+def _candidate_lists(node, parent="", depth=0):
+    """Yield (hinted, items) for every list (or id-keyed map) of dicts."""
+    if depth > MAX_DEPTH:
+        return
+    if isinstance(node, list):
+        if node and sum(_jobish(x) for x in node) * 2 >= len(node) and any(_jobish(x) for x in node):
+            yield any(h in parent.lower() for h in JOB_HINTS), node
+        for x in node:
+            yield from _candidate_lists(x, parent, depth + 1)
+    elif isinstance(node, dict):
+        values = [v for v in node.values() if isinstance(v, dict)]
+        if len(values) >= 2 and sum(_jobish(v) for v in values) * 2 >= len(node):
+            hinted = any(h in str(k).lower() for k in node for h in JOB_HINTS)
+            yield hinted, values
+        for k, v in node.items():
+            yield from _candidate_lists(v, str(k), depth + 1)
+
+def _embedded_location(item):
+    if item.get("remote") is True or item.get("isRemote") is True:
+        return "Remote"
+    categories = item.get("categories")
+    if isinstance(categories, dict) and isinstance(categories.get("location"), str):
+        return categories["location"]
+    loc = _first(item, LOCATION_KEYS)
+    if isinstance(loc, list):
+        loc = loc[0] if loc else None
+    if isinstance(loc, dict):
+        return _location({"jobLocation": loc}) or _text(loc.get("city") or loc.get("name"))
+    return _text(loc) if isinstance(loc, str) else None
+
+def _embedded_date(item):
+    value = _first(item, DATE_KEYS)
+    if isinstance(value, (int, float)) and value > 0:
+        seconds = value / 1000 if value > 1e11 else value    # epoch ms or s
+        try:
+            return datetime.fromtimestamp(seconds).strftime(DATE_FORMAT)
+        except (OverflowError, OSError, ValueError):
+            return None
+    return format_date(value)
+
+def _embedded_url(item, base_url, hinted=True):
+    """The item's own URL; for hinted job arrays only, one built from its id."""
+    url = _first(item, URL_KEYS)
+    if isinstance(url, str):
+        return urljoin(base_url, url)
+    ident = _first(item, ID_KEYS)
+    if hinted and isinstance(ident, (str, int)):
+        return urljoin(base_url.rstrip("/") + "/", str(ident))
+    return None
+
+def jobs_from_json(data, base_url):
+    """Locate the most plausible job array anywhere in a JSON document."""
+    best = None
+    for hinted, items in _candidate_lists(data):
+        # unhinted lists (menus, blog cards with title/slug/date) must carry
+        # a location or department like postings do; a date is not enough
+        if not hinted and not any(_embedded_location(x) or _first(x, ("department", "team"))
+                                  for x in items if isinstance(x, dict)):
+            continue
+        score = (hinted, sum(_jobish(x) for x in items))
+        if best is None or score > best[0]:
+            best = (score, hinted, items)
+    if best is None:
+        return []
+    _, hinted, items = best
+    jobs = []
+    for item in items:
+        url = _embedded_url(item, base_url, hinted) if _jobish(item) else None
+        if url:
+            jobs.append({
+                "title": _text(_first(item, TITLE_KEYS)),
+                "url": url,
+                "location": _embedded_location(item),
+                "date": _embedded_date(item),
+            })
+    return jobs
+
+def embedded_job_postings(soup, base_url):
+    """Jobs from inline SPA state (__NEXT_DATA__, __NUXT_DATA__,
+    window.__INITIAL_STATE__ and similar) - no browser, no extra request."""
+    jobs = []
+    for data in _state_payloads(soup):
+        jobs.extend(jobs_from_json(data, base_url))
+    return jobs
+
+# ================= ATS JSON ENDPOINTS ================= #
+
+ATS_ENDPOINTS = [
+    (re.compile(r"https?://jobs\.(?:eu\.)?lever\.co/([^/?#]+)"), "https://api.lever.co/v0/postings/{}?mode=json"),
+    (re.compile(r"https?://(?:job-)?boards\.greenhouse\.io/([^/?#]+)"), "https://boards-api.greenhouse.io/v1/boards/{}/jobs"),
+    (re.compile(r"https?://jobs\.ashbyhq\.com/([^/?#]+)"), "https://api.ashbyhq.com/posting-api/job-board/{}"),
+    (re.compile(r"https?://apply\.workable\.com/([^/?#]+)"), "https://apply.workable.com/api/v1/widget/accounts/{}"),
+]
+
+def json_endpoint(listing_url):
+    """Public JSON feed behind a client-rendered ATS board, if known."""
+    for pattern, template in ATS_ENDPOINTS:
+        m = pattern.match(listing_url or "")
+        if m and m.group(1) not in ("api", "embed", "v1"):
+            return template.format(m.group(1))
+    return None